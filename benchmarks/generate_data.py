@@ -0,0 +1,147 @@
+import os
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+
+# Conceito: Dados sintéticos para benchmark.
+    # O repositório só traz o googleplaystore.csv (~10,8 mil linhas). Para medir o pipeline em escala, estes geradores produzem arquivos
+    # com o mesmo layout e as mesmas "sujeiras" do dataset real, nas proporções observadas nele:
+    # "Varies with device" em Size, Installs no formato "1,000+", preços "$4.99", gêneros múltiplos ("Art & Design;Pretend Play"),
+    # ratings ausentes, apps repetidos e linhas desalinhadas (sem o campo Category, como a linha "1.9" do arquivo original).
+    # A geração é feita em blocos, então arquivos de dezenas de milhões de linhas não precisam caber em memória.
+CATEGORIES = [
+    'FAMILY', 'GAME', 'TOOLS', 'MEDICAL', 'BUSINESS', 'PRODUCTIVITY', 'PERSONALIZATION', 'COMMUNICATION', 'SPORTS', 'LIFESTYLE',
+    'FINANCE', 'HEALTH_AND_FITNESS', 'PHOTOGRAPHY', 'SOCIAL', 'NEWS_AND_MAGAZINES', 'SHOPPING', 'TRAVEL_AND_LOCAL', 'DATING',
+    'BOOKS_AND_REFERENCE', 'VIDEO_PLAYERS', 'EDUCATION', 'ENTERTAINMENT', 'MAPS_AND_NAVIGATION', 'FOOD_AND_DRINK', 'HOUSE_AND_HOME',
+    'AUTO_AND_VEHICLES', 'LIBRARIES_AND_DEMO', 'WEATHER', 'ART_AND_DESIGN', 'EVENTS', 'PARENTING', 'COMICS', 'BEAUTY',
+]
+GENRES = ['Tools', 'Entertainment', 'Education', 'Medical', 'Business', 'Productivity', 'Sports', 'Personalization', 'Communication', 'Lifestyle', 'Action', 'Art & Design', 'Casual', 'Puzzle']
+SECONDARY_GENRES = ['Pretend Play', 'Action & Adventure', 'Brain Games', 'Creativity', 'Education', 'Music & Video']
+CONTENT_RATINGS = ['Everyone', 'Teen', 'Mature 17+', 'Everyone 10+', 'Adults only 18+', 'Unrated']
+INSTALLS = ['0+', '1+', '5+', '10+', '50+', '100+', '500+', '1,000+', '5,000+', '10,000+', '50,000+', '100,000+', '500,000+', '1,000,000+', '5,000,000+', '10,000,000+', '50,000,000+', '100,000,000+', '1,000,000,000+']
+ANDROID_VERSIONS = ['4.1 and up', '4.0.3 and up', '4.0 and up', 'Varies with device', '4.4 and up', '2.3 and up', '5.0 and up', '4.2 and up', '5.0 - 8.0']
+SENTIMENTS = ['Positive', 'Negative', 'Neutral']
+REVIEW_TEXTS = ['Great app, love it', 'Too many ads', 'Works fine', 'Crashes after update, "fix it"', 'Best one so far', 'Meh']
+
+APPS_COLUMNS = ['App', 'Category', 'Rating', 'Reviews', 'Size', 'Installs', 'Type', 'Price', 'Content Rating', 'Genres', 'Last Updated', 'Current Ver', 'Android Ver']
+REVIEWS_COLUMNS = ['App', 'Translated_Review', 'Sentiment', 'Sentiment_Polarity', 'Sentiment_Subjectivity']
+
+# Proporções aproximadas observadas no googleplaystore.csv.
+MISSING_RATING_RATE = 0.136
+VARIES_SIZE_RATE = 0.156
+PAID_RATE = 0.074
+MULTI_GENRE_RATE = 0.046
+DUPLICATE_APP_RATE = 0.11
+MISALIGNED_ROW_RATE = 0.0001
+MISSING_SENTIMENT_RATE = 0.42
+
+
+def app_name(ids: np.ndarray) -> pd.Series:
+    return 'App ' + pd.Series(ids).astype(str)
+
+
+def _choice(rng: np.random.Generator, values: list, size: int) -> np.ndarray:
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def _apps_chunk(rng: np.random.Generator, start_id: int, rows: int) -> pd.DataFrame:
+    ids = np.arange(start_id, start_id + rows)
+    # Parte dos apps repete um id anterior, como o mesmo app listado em várias categorias/retratos.
+    duplicated = rng.random(rows) < DUPLICATE_APP_RATE
+    ids[duplicated] = (rng.random(duplicated.sum()) * ids[duplicated]).astype(ids.dtype)
+
+    ratings = np.round(rng.uniform(1.0, 5.0, rows), 1).astype(object)
+    ratings[rng.random(rows) < MISSING_RATING_RATE] = 'NaN'
+
+    sizes = pd.Series(np.round(rng.uniform(1, 100, rows), 1)).astype(str) + 'M'
+    in_kb = rng.random(rows) < 0.05
+    sizes[in_kb] = pd.Series(rng.integers(8, 1000, in_kb.sum())).astype(str).to_numpy() + 'k'
+    sizes[rng.random(rows) < VARIES_SIZE_RATE] = 'Varies with device'
+
+    paid = rng.random(rows) < PAID_RATE
+    prices = np.where(paid, '$' + pd.Series(np.round(rng.uniform(0.99, 29.99, rows), 2)).astype(str), '0')
+
+    genres = pd.Series(_choice(rng, GENRES, rows))
+    multi = rng.random(rows) < MULTI_GENRE_RATE
+    genres[multi] = genres[multi] + ';' + _choice(rng, SECONDARY_GENRES, multi.sum())
+
+    dates = pd.Timestamp('2010-05-21') + pd.to_timedelta(rng.integers(0, 3000, rows), unit='D')
+
+    return pd.DataFrame({
+        'App': app_name(ids),
+        'Category': _choice(rng, CATEGORIES, rows),
+        'Rating': ratings,
+        'Reviews': rng.integers(0, 5_000_000, rows),
+        'Size': sizes,
+        'Installs': _choice(rng, INSTALLS, rows),
+        'Type': np.where(paid, 'Paid', 'Free'),
+        'Price': prices,
+        'Content Rating': _choice(rng, CONTENT_RATINGS, rows),
+        'Genres': genres,
+        'Last Updated': dates.strftime('%B ') + dates.day.astype(str) + dates.strftime(', %Y'),
+        'Current Ver': pd.Series(rng.integers(1, 10, rows)).astype(str) + '.' + pd.Series(rng.integers(0, 20, rows)).astype(str) + '.' + pd.Series(rng.integers(0, 9, rows)).astype(str),
+        'Android Ver': _choice(rng, ANDROID_VERSIONS, rows),
+    })
+
+
+def _misaligned_lines(rng: np.random.Generator, start_id: int, rows: int) -> list[str]:
+    # Mesmo defeito da linha real: o campo Category está ausente e todos os valores seguintes deslocam uma coluna para a esquerda.
+    return [
+        f'App {start_id + i} Misaligned,1.9,19,3.0M,"1,000+",Free,0,Everyone,,"February 11, 2018",1.0.19,4.0 and up\n'
+        for i in range(rows)
+    ]
+
+
+def generate_apps_csv(file_path: str, rows: int, seed: int = 0, chunk_rows: int = 500_000) -> str:
+    logging.info(f"Gerando {rows} linhas de apps sintéticos em {file_path}...")
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+
+    with open(file_path, 'w', encoding='utf-8', newline='') as file:
+        file.write(','.join(APPS_COLUMNS) + '\n')
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            misaligned = rng.binomial(size, MISALIGNED_ROW_RATE)
+            _apps_chunk(rng, start, size - misaligned).to_csv(file, header=False, index=False, lineterminator='\n')
+            file.writelines(_misaligned_lines(rng, start + size - misaligned, misaligned))
+
+    return file_path
+
+
+def generate_reviews_csv(file_path: str, rows: int, apps: int, seed: int = 1, chunk_rows: int = 1_000_000) -> str:
+    logging.info(f"Gerando {rows} reviews sintéticas para {apps} apps em {file_path}...")
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+
+    with open(file_path, 'w', encoding='utf-8', newline='') as file:
+        file.write(','.join(REVIEWS_COLUMNS) + '\n')
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            # Como no dataset real, uma grande fração das linhas não tem texto nem sentimento ("nan").
+            missing = rng.random(size) < MISSING_SENTIMENT_RATE
+            chunk = pd.DataFrame({
+                'App': app_name(rng.integers(0, apps, size)),
+                'Translated_Review': np.where(missing, 'nan', _choice(rng, REVIEW_TEXTS, size)),
+                'Sentiment': np.where(missing, 'nan', _choice(rng, SENTIMENTS, size)),
+                'Sentiment_Polarity': np.where(missing, np.nan, np.round(rng.uniform(-1, 1, size), 6)),
+                'Sentiment_Subjectivity': np.where(missing, np.nan, np.round(rng.uniform(0, 1, size), 6)),
+            })
+            chunk.to_csv(file, header=False, index=False, lineterminator='\n', na_rep='nan')
+
+    return file_path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Gera CSVs sintéticos de apps e reviews da Google Play Store.")
+    parser.add_argument('--apps', type=int, default=10_000, help="Número de linhas de apps.")
+    parser.add_argument('--reviews', type=int, default=50_000, help="Número de linhas de reviews.")
+    parser.add_argument('--output-dir', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate_apps_csv(os.path.join(args.output_dir, f'apps_{args.apps}.csv'), args.apps, seed=args.seed)
+    generate_reviews_csv(os.path.join(args.output_dir, f'reviews_{args.reviews}.csv'), args.reviews, apps=args.apps, seed=args.seed + 1)
@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import subprocess
+import pandas as pd
+from tabulate import tabulate
+
+# Permite executar tanto "python -m benchmarks.run_benchmarks" quanto "python benchmarks/run_benchmarks.py" a partir da raiz do projeto.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extract.extract_csv import PARSER_BACKENDS, extract_apps, extract_reviews
+from transform.transform import transform_google_play_apps, transform_user_reviews, aggregate_reviews, unify_dataframes
+from load.load_SQLite import load_dataframe_to_db
+from pipeline.metrics import PeakRss
+from benchmarks.generate_data import generate_apps_csv, generate_reviews_csv
+
+
+# Conceito: Benchmark reprodutível.
+    # Para cada escala, gera (ou reaproveita) os CSVs sintéticos e mede cada etapa do pipeline isoladamente:
+    # tempo de parede, linhas de entrada/saída, vazão (linhas/s) e pico de memória residente (RSS) durante a etapa.
+    # O resultado vai para um JSON identificado pelo commit, que pode ser comparado com o de outro commit (--compare).
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def time_stage(results: list, scale: int, stage: str, func, *args, rows_in: int, **kwargs):
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        output = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+    rows_out = len(output) if isinstance(output, pd.DataFrame) else None
+    record = {
+        'scale': scale,
+        'stage': stage,
+        'seconds': round(elapsed, 4),
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'rows_per_sec': round(rows_in / elapsed, 1) if elapsed else None,
+        'peak_rss_mb': round(rss.peak / 1024 ** 2, 1),
+    }
+    results.append(record)
+    logging.info(f"[{scale}] {stage}: {record['seconds']}s, {record['rows_per_sec']} linhas/s, pico RSS {record['peak_rss_mb']} MB")
+    return output
+
+
+# parser_engine: None mede a extração original (params_csv com engine python); 'python', 'c' ou 'pyarrow' medem o read_csv_typed
+    # com schema declarado, que trata as linhas desalinhadas dos dados sintéticos e as grava na quarentena (data_dir/quarantine).
+def run_benchmark(scale: int, data_dir: str, reviews_per_app: int = 5, parser_engine: str | None = None) -> list[dict]:
+    apps_path = os.path.join(data_dir, f'apps_{scale}.csv')
+    reviews_rows = scale * reviews_per_app
+    reviews_path = os.path.join(data_dir, f'reviews_{reviews_rows}.csv')
+
+    if not os.path.exists(apps_path):
+        generate_apps_csv(apps_path, scale)
+    if not os.path.exists(reviews_path):
+        generate_reviews_csv(reviews_path, reviews_rows, apps=scale)
+
+    results = []
+    quarantine_dir = os.path.join(data_dir, 'quarantine')
+    df_apps = time_stage(results, scale, 'extract_apps', extract_apps, apps_path, parser_backend=parser_engine, quarantine_dir=quarantine_dir, rows_in=scale)
+    df_reviews = time_stage(results, scale, 'extract_reviews', extract_reviews, reviews_path, parser_backend=parser_engine, quarantine_dir=quarantine_dir, rows_in=reviews_rows)
+
+    df_apps_transformed = time_stage(results, scale, 'transform_google_play_apps', transform_google_play_apps, df_apps, rows_in=len(df_apps))
+    df_reviews_transformed = time_stage(results, scale, 'transform_user_reviews', transform_user_reviews, df_reviews, rows_in=len(df_reviews))
+    df_reviews_aggregated = time_stage(results, scale, 'aggregate_reviews', aggregate_reviews, df_reviews_transformed, rows_in=len(df_reviews_transformed))
+    df_unified = time_stage(results, scale, 'unify_dataframes', unify_dataframes, df_apps_transformed, df_reviews_aggregated, rows_in=len(df_apps_transformed))
+
+    db_path = os.path.join(data_dir, f'benchmark_{scale}.sqlite')
+    time_stage(results, scale, 'load_dataframe_to_db', load_dataframe_to_db, df_unified, f"sqlite:///{db_path}", 'googleplay_data', rows_in=len(df_unified))
+    os.remove(db_path)
+
+    return results
+
+
+def compare_results(baseline_path: str, current_path: str) -> str:
+    with open(baseline_path) as baseline_file, open(current_path) as current_file:
+        baseline, current = json.load(baseline_file), json.load(current_file)
+
+    df_baseline = pd.DataFrame(baseline['results']).set_index(['scale', 'stage'])
+    df_current = pd.DataFrame(current['results']).set_index(['scale', 'stage'])
+    df = df_baseline[['seconds', 'peak_rss_mb']].join(df_current[['seconds', 'peak_rss_mb']], lsuffix='_base', rsuffix='_new', how='inner')
+    df['speedup'] = (df['seconds_base'] / df['seconds_new']).round(2)
+    df['rss_delta_mb'] = (df['peak_rss_mb_new'] - df['peak_rss_mb_base']).round(1)
+
+    title = f"{baseline['commit']} -> {current['commit']}"
+    return title + '\n' + tabulate(df.reset_index(), headers='keys', tablefmt='github', showindex=False)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pipeline ETL com dados sintéticos.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10_000, 100_000], help="Linhas de apps por execução (ex: 10000 1000000 50000000).")
+    parser.add_argument('--reviews-per-app', type=int, default=5)
+    parser.add_argument('--parser-engine', choices=PARSER_BACKENDS, help="Backend do read_csv_typed; sem a opção, mede a extração original (params_csv).")
+    parser.add_argument('--data-dir', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--output', help="Arquivo JSON de resultados (padrão: benchmarks/results/<commit>.json).")
+    parser.add_argument('--compare', metavar='BASELINE_JSON', help="Compara os resultados desta execução com um JSON anterior.")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    commit = _git_commit()
+    output_path = args.output or os.path.join('benchmarks', 'results', f'{commit}.json')
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    all_results = []
+    for scale in args.scales:
+        all_results.extend(run_benchmark(scale, args.data_dir, reviews_per_app=args.reviews_per_app, parser_engine=args.parser_engine))
+
+    report = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'parser_engine': args.parser_engine,
+        'results': all_results,
+    }
+    with open(output_path, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    logging.info(f"Resultados gravados em {output_path}")
+
+    print(tabulate(all_results, headers='keys', tablefmt='github'))
+    if args.compare:
+        print(compare_results(args.compare, output_path))
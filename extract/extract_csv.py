@@ -1,5 +1,50 @@
 import pandas as pd
+import numpy as np
+import io
+import os
+import csv
+import hashlib
 import logging
+import threading
+from pandas.io.common import get_handle
+from pipeline.metrics import record_count
+from pipeline.cache import record_output_file
+
+
+# Conceito: Schema estável em modo streaming.
+    # Em leitura por chunks, o pandas infere os tipos de cada chunk isoladamente. Um chunk só com versões "1.0" viraria float e perderia o zero final ("1.10" -> 1.1).
+    # Forçar texto nas colunas que no arquivo inteiro já são object garante que todos os chunks tenham o mesmo schema da leitura completa.
+APPS_CHUNK_DTYPES = {
+    'App': str, 'Category': str, 'Reviews': str, 'Size': str, 'Installs': str, 'Type': str, 'Price': str,
+    'Content Rating': str, 'Genres': str, 'Last Updated': str, 'Current Ver': str, 'Android Ver': str,
+}
+REVIEWS_CHUNK_DTYPES = {'App': str, 'Translated_Review': str, 'Sentiment': str}
+
+
+# Conceito: Backends de parsing.
+    # "python" é o parser original (flexível, porém lento); "c" e "pyarrow" são parsers nativos, muitas vezes 5 a 20x mais rápidos.
+    # O pyarrow é opcional: só é importado pelo pandas quando esse backend é escolhido.
+PARSER_BACKENDS = ('python', 'c', 'pyarrow')
+
+
+# Conceito: Schema declarado.
+    # Em vez de deixar o pandas inferir (e carregar tudo como object), cada arquivo tem os tipos declarados:
+    # colunas de baixa cardinalidade viram category e os scores de sentimento viram float32, reduzindo memória e o custo da conversão.
+    # Colunas "object" continuam texto e são tratadas na etapa de transformação.
+APPS_SCHEMA = {
+    'App': 'object', 'Category': 'category', 'Rating': 'float64', 'Reviews': 'object', 'Size': 'object',
+    'Installs': 'object', 'Type': 'category', 'Price': 'object', 'Content Rating': 'category',
+    'Genres': 'category', 'Last Updated': 'object', 'Current Ver': 'object', 'Android Ver': 'object',
+}
+REVIEWS_SCHEMA = {
+    'App': 'object', 'Translated_Review': 'object', 'Sentiment': 'category',
+    'Sentiment_Polarity': 'float32', 'Sentiment_Subjectivity': 'float32',
+}
+
+# Regras de validação por coluna (expressão regular que o valor inteiro deve casar).
+    # Exemplo: a linha desalinhada do dataset traz "1.9" em Category; ela não casa com o padrão e vai para a quarentena.
+APPS_VALIDATION = {'Category': r'[A-Z_]+', 'Type': r'Free|Paid'}
+REVIEWS_VALIDATION = {'Sentiment': r'Positive|Negative|Neutral'}
 
 
 def params_csv(file_path: str, delimiter: str = ",", encoding: str = "utf-8", quotechar: str = '"', engine: str = "python", **kwargs ) -> pd.DataFrame:
@@ -8,18 +53,215 @@ def params_csv(file_path: str, delimiter: str = ",", encoding: str = "utf-8", qu
     return pd.read_csv(file_path, delimiter=delimiter, encoding=encoding, quotechar=quotechar, engine=engine, **kwargs)
 
 
-def extract_data(file_path_apps: str, file_path_reviews: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+# Conceito: Quarentena.
+    # Linhas que o parser rápido rejeita (número errado de campos) ou que violam o schema não derrubam a leitura do arquivo inteiro:
+    # elas são separadas, recebem o motivo em Quarantine_Reason e podem ser gravadas em um CSV à parte para inspeção.
+def _validate_schema(df: pd.DataFrame, schema: dict, validation: dict | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    validation = validation or {}
+    reasons = pd.Series(None, index=df.index, dtype=object)
+
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            logging.warning(f"Coluna '{column}' declarada no schema não existe no arquivo.")
+            continue
+
+        values = df[column]
+        invalid = pd.Series(False, index=df.index)
+
+        if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype)):
+            invalid |= values.notna() & pd.to_numeric(values, errors='coerce').isna()
+
+        pattern = validation.get(column)
+        if pattern:
+            invalid |= values.notna() & ~values.astype(str).str.fullmatch(pattern)
+
+        reasons = reasons.mask(invalid & reasons.isna(), f"valor inválido em '{column}'")
+
+    is_quarantined = reasons.notna()
+    df_valid = df[~is_quarantined].copy()
+    df_quarantine = df[is_quarantined].assign(Quarantine_Reason=reasons[is_quarantined])
+
+    for column, dtype in schema.items():
+        if column not in df_valid.columns or dtype == 'object':
+            continue
+        if dtype == 'category':
+            df_valid[column] = df_valid[column].astype('category')
+        else:
+            df_valid[column] = pd.to_numeric(df_valid[column]).astype(dtype)
+
+    return df_valid, df_quarantine
+
+
+# Shards lidos em threads diferentes gravam cada um no próprio arquivo (ver _quarantine_path); o lock protege as escritas que ainda coincidirem.
+_quarantine_lock = threading.Lock()
+
+
+def _write_quarantine(df_quarantine: pd.DataFrame, quarantine_path: str | None, append: bool = False) -> None:
+    if df_quarantine.empty:
+        return
+
+    logging.warning(f"{len(df_quarantine)} linha(s) enviada(s) para a quarentena.")
+    record_count('quarantined', len(df_quarantine))
+    if quarantine_path is None:
+        return
+
+    os.makedirs(os.path.dirname(quarantine_path) or '.', exist_ok=True)
+    with _quarantine_lock:
+        write_header = not (append and os.path.exists(quarantine_path))
+        df_quarantine.to_csv(quarantine_path, mode='a' if append else 'w', header=write_header, index=False)
+    record_output_file(quarantine_path)
+    logging.info(f"Quarentena gravada em: {quarantine_path}")
+
+
+def _bad_line_collector(backend: str, rejected: list, delimiter: str = ",", quotechar: str = '"'):
+    # Cada parser reporta linhas mal formadas de um jeito: o python entrega a lista de campos, o pyarrow um objeto com o texto da linha.
+    # Os campos do python voltam a ser uma linha com csv.writer, que refaz as aspas de campos com vírgulas, aspas ou quebras de linha.
+    if backend == 'python':
+        def collect(fields):
+            line = io.StringIO()
+            csv.writer(line, delimiter=delimiter, quotechar=quotechar, lineterminator='\n').writerow(fields)
+            rejected.append(line.getvalue()[:-1])
+            return None
+        return collect
+
+    def collect(row):
+        rejected.append(row.text)
+        return 'skip'
+    return collect
+
+
+# O parser C só sabe avisar (warnings) sobre linhas rejeitadas, e capturar warnings não é seguro com leituras em várias threads
+    # (além disso, em chunks ele às vezes apenas corta os campos extras sem avisar). Por isso o backend 'c' lê só as colunas do cabeçalho
+    # (usecols, que mantém todas as linhas) e as linhas com campos demais são localizadas antes por esta varredura com o módulo csv,
+    # que devolve {posição da linha de dados: texto original} (inclusive quebras de linha entre aspas).
+    # A posição é a mesma do índice do DataFrame lido pelo pandas: cabeçalho e linhas em branco não contam.
+def _scan_long_records(file_path: str, delimiter: str = ",", quotechar: str = '"', encoding: str = "utf-8", compression='infer') -> tuple[int, dict]:
+    long_records = {}
+    n_fields = None
+    with get_handle(file_path, 'r', encoding=encoding, compression=compression) as handles:
+        lines = []
+
+        def read_lines():
+            for line in handles.handle:
+                lines.append(line)
+                yield line
+
+        position = -1
+        for row in csv.reader(read_lines(), delimiter=delimiter, quotechar=quotechar):
+            if not row or (len(row) == 1 and not row[0].strip()):
+                lines.clear()
+                continue
+            if n_fields is None:
+                n_fields = len(row)
+            elif len(row) > n_fields:
+                long_records[position] = ''.join(lines).rstrip('\r\n')
+            lines.clear()
+            position += 1
+
+    return n_fields or 0, long_records
+
+
+# Leitura com backend e schema declarados.
+    # Todas as colunas são lidas como texto (nenhuma conversão falha durante o parsing), validadas e só então convertidas para os tipos do schema.
+    # Com chunksize, devolve um gerador de chunks já validados; a primeira gravação da quarentena substitui o arquivo e as seguintes anexam.
+def read_csv_typed(file_path: str, schema: dict, backend: str = 'c', validation: dict | None = None, quarantine_path: str | None = None, chunksize: int | None = None, **kwargs):
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Backend de parsing desconhecido: {backend}. Opções: {PARSER_BACKENDS}")
+
+    if chunksize and backend == 'pyarrow':
+        logging.warning("O backend pyarrow não suporta leitura em chunks; usando o backend 'c'.")
+        backend = 'c'
+
+    rejected = []
+    long_records = {}
+    if backend == 'c':
+        csv_options = {option: kwargs[option] for option in ('delimiter', 'quotechar', 'encoding', 'compression') if option in kwargs}
+        n_fields, long_records = _scan_long_records(file_path, **csv_options)
+        read_kwargs = {'usecols': range(n_fields)}
+    else:
+        csv_options = {option: kwargs[option] for option in ('delimiter', 'quotechar') if option in kwargs}
+        read_kwargs = {'on_bad_lines': _bad_line_collector(backend, rejected, **csv_options)}
+
+    quarantine_written = False
+
+    def split(df_raw: pd.DataFrame) -> pd.DataFrame:
+        nonlocal quarantine_written
+        if long_records:
+            positions = df_raw.index.intersection(list(long_records))
+            rejected.extend(long_records.pop(position) for position in positions)
+            df_raw = df_raw.drop(positions)
+        df_valid, df_quarantine = _validate_schema(df_raw, schema, validation)
+        if rejected:
+            df_rejected = pd.DataFrame({'Raw_Line': rejected, 'Quarantine_Reason': 'linha rejeitada pelo parser'})
+            df_quarantine = pd.concat([df_quarantine, df_rejected], ignore_index=True)
+            rejected.clear()
+        _write_quarantine(df_quarantine, quarantine_path, append=quarantine_written)
+        quarantine_written = quarantine_written or not df_quarantine.empty
+        return df_valid
+
+    # Com dtype=str o pyarrow converte nulos no texto "nan"; o dtype 'string' preserva os nulos, que depois voltam a ser NaN em colunas object.
+    text_dtype = 'string' if backend == 'pyarrow' else str
+
+    result = params_csv(file_path, engine=backend, dtype=text_dtype, chunksize=chunksize, **read_kwargs, **kwargs)
+
+    if not chunksize:
+        if backend == 'pyarrow':
+            result = result.astype(object).where(result.notna(), np.nan)
+        return split(result)
+
+    def iter_chunks():
+        with result:
+            for df_chunk in result:
+                yield split(df_chunk)
+
+    return iter_chunks()
+
+
+# Um arquivo de quarentena por arquivo de entrada: shards com o mesmo nome em pastas diferentes (ex: drops/2024-06-01/reviews.csv)
+    # são diferenciados por um hash curto do caminho completo.
+def _quarantine_path(file_path: str, quarantine_dir: str) -> str:
+    file_name = os.path.splitext(os.path.basename(file_path))[0]
+    path_hash = hashlib.blake2b(os.path.abspath(file_path).encode(), digest_size=4).hexdigest()
+    return os.path.join(quarantine_dir, f"{file_name}_{path_hash}_quarantine.csv")
+
+
+# kwargs extras (ex: compression) são repassados ao pandas.read_csv.
+def _extract_file(file_path: str, schema: dict, validation: dict, chunk_dtypes: dict, chunksize: int | None, parser_backend: str | None, quarantine_dir: str | None, **kwargs):
+    # Sem backend declarado, mantém a leitura original (parser python com inferência de tipos).
+    if parser_backend is None:
+        if chunksize:
+            return params_csv(file_path, chunksize=chunksize, dtype=chunk_dtypes, **kwargs)
+        return params_csv(file_path, **kwargs)
+
+    quarantine_path = _quarantine_path(file_path, quarantine_dir) if quarantine_dir else None
+
+    return read_csv_typed(file_path, schema, backend=parser_backend, validation=validation, quarantine_path=quarantine_path, chunksize=chunksize, **kwargs)
+
+
+def extract_apps(file_path: str, chunksize: int | None = None, parser_backend: str | None = None, quarantine_dir: str | None = None, **kwargs):
+    return _extract_file(file_path, APPS_SCHEMA, APPS_VALIDATION, APPS_CHUNK_DTYPES, chunksize, parser_backend, quarantine_dir, **kwargs)
+
+
+def extract_reviews(file_path: str, chunksize: int | None = None, parser_backend: str | None = None, quarantine_dir: str | None = None, **kwargs):
+    return _extract_file(file_path, REVIEWS_SCHEMA, REVIEWS_VALIDATION, REVIEWS_CHUNK_DTYPES, chunksize, parser_backend, quarantine_dir, **kwargs)
+
+
+# Conceito: Streaming.
+    # Com chunksize, em vez de DataFrames completos, extract_data devolve leitores iteráveis que produzem DataFrames de no máximo `chunksize` linhas.
+    # O consumo de memória passa a depender do tamanho do chunk, e não do tamanho do arquivo.
+    # parser_backend ('python', 'c' ou 'pyarrow') ativa a leitura com schema declarado; linhas rejeitadas vão para arquivos em quarantine_dir.
+def extract_data(file_path_apps: str, file_path_reviews: str, chunksize: int | None = None, parser_backend: str | None = None, quarantine_dir: str | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
 
     df_apps = None
     df_reviews = None
 
     try:
         logging.info(f"Iniciando extração de dados: {file_path_apps}")
-        df_apps = params_csv(file_path_apps)
+        df_apps = extract_apps(file_path_apps, chunksize=chunksize, parser_backend=parser_backend, quarantine_dir=quarantine_dir)
         logging.info("Google Play Store (apps) extraídos com sucesso.")
 
         logging.info(f"Iniciando extração de dados: {file_path_reviews}")
-        df_reviews = params_csv(file_path_reviews)
+        df_reviews = extract_reviews(file_path_reviews, chunksize=chunksize, parser_backend=parser_backend, quarantine_dir=quarantine_dir)
         logging.info("User Reviews extraídos com sucesso.")
 
         return df_apps, df_reviews
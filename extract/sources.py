@@ -0,0 +1,172 @@
+import os
+import glob
+import asyncio
+import logging
+import itertools
+import contextvars
+import importlib.util
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from pandas.api.types import union_categoricals
+from extract.extract_csv import extract_apps, extract_reviews
+
+
+# Conceito: Registro de leitores (multi-fonte).
+    # Cada fonte de entrada pode ser um arquivo, uma pasta ou um padrão glob (ex: "drops/2024-06-*/reviews_*.csv.gz").
+    # A fonte é expandida em shards (arquivos); o formato de cada shard sai da extensão e a compressão é removida de forma transparente:
+    # "reviews_br.csv.gz" é lido pelo leitor 'csv' com compression='gzip'. Novos formatos são adicionados com @register_reader.
+    # Os shards são lidos ao mesmo tempo (asyncio + pool de threads) e concatenados uma única vez no final.
+READERS = {}
+READER_EXTENSIONS = {}
+
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd', '.zstd': 'zstd'}
+# Pacotes exigidos pelo pandas para cada compressão que não vem com o Python.
+COMPRESSION_PACKAGES = {'zstd': 'zstandard'}
+
+EXTRACTORS = {'apps': extract_apps, 'reviews': extract_reviews}
+
+
+# Um leitor recebe (caminho, tipo do arquivo ('apps' ou 'reviews'), compressão, chunksize, parser_backend, quarantine_dir)
+    # e devolve um DataFrame ou, com chunksize, um iterável de DataFrames.
+def register_reader(file_format: str, extensions: tuple[str, ...]):
+    def decorator(reader):
+        READERS[file_format] = reader
+        for extension in extensions:
+            READER_EXTENSIONS[extension] = file_format
+        return reader
+    return decorator
+
+
+@register_reader('csv', ('.csv', '.txt'))
+def read_csv_source(file_path: str, kind: str, compression: str | None = None, chunksize: int | None = None, parser_backend: str | None = None, quarantine_dir: str | None = None):
+    kwargs = {'compression': compression} if compression else {}
+    return EXTRACTORS[kind](file_path, chunksize=chunksize, parser_backend=parser_backend, quarantine_dir=quarantine_dir, **kwargs)
+
+
+# JSON Lines (um objeto por linha): os valores são mantidos como vieram (dtype=False), e a transformação trata os tipos como no CSV.
+@register_reader('jsonl', ('.jsonl', '.ndjson'))
+def read_jsonl_source(file_path: str, kind: str, compression: str | None = None, chunksize: int | None = None, parser_backend: str | None = None, quarantine_dir: str | None = None):
+    logging.info(f"Tentando ler o arquivo JSON Lines: {file_path}")
+    # Sem esta verificação, o pandas trataria um caminho inexistente como o próprio texto JSON e só falharia ao ler o primeiro chunk.
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+    return pd.read_json(file_path, lines=True, dtype=False, compression=compression, chunksize=chunksize)
+
+
+# Devolve (formato, compressão) de um shard a partir das extensões, ex: "reviews.csv.zst" -> ('csv', 'zstd').
+def detect_format(file_path: str) -> tuple[str, str | None]:
+    root, extension = os.path.splitext(file_path.lower())
+    compression = COMPRESSION_SUFFIXES.get(extension)
+    if compression:
+        root, extension = os.path.splitext(root)
+
+        package = COMPRESSION_PACKAGES.get(compression)
+        if package and importlib.util.find_spec(package) is None:
+            raise ImportError(f"O arquivo {file_path} usa compressão {compression}, que exige o pacote opcional '{package}' (pip install {package}).")
+
+    file_format = READER_EXTENSIONS.get(extension)
+    if file_format is None:
+        raise ValueError(f"Formato de arquivo não suportado: {file_path}. Extensões conhecidas: {sorted(READER_EXTENSIONS)}")
+    return file_format, compression
+
+
+def _is_supported(file_path: str) -> bool:
+    root, extension = os.path.splitext(file_path.lower())
+    if extension in COMPRESSION_SUFFIXES:
+        extension = os.path.splitext(root)[1]
+    return extension in READER_EXTENSIONS
+
+
+# Expande fontes (arquivos, pastas ou padrões glob, inclusive "**") em uma lista ordenada de shards, sem repetições.
+    # Em pastas, apenas arquivos com extensão conhecida (comprimidos ou não) são considerados.
+def expand_sources(sources: str | list[str]) -> list[str]:
+    if isinstance(sources, str):
+        sources = [sources]
+
+    shards = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(path for path in glob.glob(os.path.join(source, '**', '*'), recursive=True) if os.path.isfile(path) and _is_supported(path))
+        elif glob.has_magic(source):
+            matches = sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+        else:
+            # Caminhos comuns são mantidos mesmo que não existam, para que a leitura reporte o FileNotFoundError como antes.
+            matches = [source]
+
+        if not matches:
+            logging.warning(f"Nenhum arquivo encontrado para a fonte '{source}'.")
+        shards.extend(matches)
+
+    return list(dict.fromkeys(shards))
+
+
+def _read_shard(file_path: str, kind: str, chunksize: int | None, parser_backend: str | None, quarantine_dir: str | None):
+    file_format, compression = detect_format(file_path)
+    return READERS[file_format](file_path, kind, compression=compression, chunksize=chunksize, parser_backend=parser_backend, quarantine_dir=quarantine_dir)
+
+
+# Cada shard é lido em uma thread do pool; o asyncio só coordena as leituras e espera todas terminarem.
+    # Leitura de disco, descompressão (zlib/zstd) e os parsers 'c'/'pyarrow' liberam o GIL, então os shards avançam de fato em paralelo
+    # (com o parser 'python', a parte de parsing continua serializada pelo GIL).
+    # copy_context() leva o contexto da etapa para as threads, para que as contagens de quarentena entrem nas métricas da etapa.
+async def _read_shards(shards: list[str], kind: str, parser_backend: str | None, quarantine_dir: str | None, workers: int) -> list[pd.DataFrame]:
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'extract_{kind}') as pool:
+        reads = [
+            loop.run_in_executor(pool, partial(contextvars.copy_context().run, _read_shard, shard, kind, None, parser_backend, quarantine_dir))
+            for shard in shards
+        ]
+        return await asyncio.gather(*reads)
+
+
+# Concatenação em um único passo (uma cópia por coluna, em vez de concatenar shard a shard).
+    # Colunas category de shards diferentes têm categorias diferentes; sem unificá-las antes, o concat as converteria para object.
+def concat_shards(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    if len(frames) == 1:
+        return frames[0]
+
+    for column in frames[0].columns:
+        if all(column in frame.columns and isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = union_categoricals([frame[column] for frame in frames]).categories
+            for frame in frames:
+                frame[column] = frame[column].cat.set_categories(categories)
+
+    return pd.concat(frames, ignore_index=True, copy=False)
+
+
+# Lê todas as fontes de um tipo ('apps' ou 'reviews') e devolve um único DataFrame (ou None em caso de erro, como extract_data).
+    # Com chunksize, devolve um iterável de chunks que percorre os shards em sequência (o modo streaming limita a memória, não o paralelismo).
+    # workers: quantos shards são lidos ao mesmo tempo (padrão: um por shard, até 16); no DAG, vem de stage_workers como nas demais etapas.
+def extract_sources(sources: str | list[str], kind: str, chunksize: int | None = None, parser_backend: str | None = None, quarantine_dir: str | None = None, workers: int | None = None):
+    if kind not in EXTRACTORS:
+        raise ValueError(f"Tipo de fonte desconhecido: {kind}. Opções: {tuple(EXTRACTORS)}")
+
+    try:
+        shards = expand_sources(sources)
+        if not shards:
+            logging.error(f"Nenhum arquivo de {kind} encontrado em {sources}.")
+            return None
+
+        logging.info(f"Iniciando extração de {len(shards)} arquivo(s) de {kind}...")
+
+        # Os leitores são abertos aqui (lista, e não gerador), para que um shard inexistente ou ilegível caia nos except abaixo.
+        if chunksize:
+            readers = [_read_shard(shard, kind, chunksize, parser_backend, quarantine_dir) for shard in shards]
+            return itertools.chain.from_iterable(readers)
+
+        if len(shards) == 1:
+            return _read_shard(shards[0], kind, None, parser_backend, quarantine_dir)
+
+        frames = asyncio.run(_read_shards(shards, kind, parser_backend, quarantine_dir, workers or min(len(shards), 16)))
+        df = concat_shards(frames)
+        logging.info(f"{len(shards)} arquivo(s) de {kind} extraídos com sucesso ({len(df)} linhas).")
+        return df
+
+    except FileNotFoundError as e:
+        logging.error(f"Erro: Arquivos não foram encontrados. Detalhes: {e}")
+        return None
+
+    except Exception as e:
+        logging.error(f"Erro durante a extração dos dados: {e}")
+        return None
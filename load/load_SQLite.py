@@ -1,6 +1,20 @@
 import pandas as pd
 from sqlalchemy import create_engine
 import logging
+import time
+
+
+# Conceito: Conversão para tipos nativos do sqlite3.
+    # O driver sqlite3 só aceita tipos Python básicos. Datas viram texto no mesmo formato usado pelo to_sql ('YYYY-MM-DD HH:MM:SS.ffffff')
+    # e valores ausentes (NaN/NaT) viram None (NULL), para que cargas feitas por caminhos diferentes gerem tabelas idênticas.
+def to_sqlite_records(df: pd.DataFrame) -> list[tuple]:
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
 
 
 def load_dataframe_to_db(df: pd.DataFrame, connection_string: str, table_name: str, if_exists: str = 'replace') -> None:
@@ -29,4 +43,90 @@ def load_dataframe_to_db(df: pd.DataFrame, connection_string: str, table_name: s
             logging.info("Conexão com o banco de dados descartada")
 
 
+# Conceito: Carga em massa (bulk load).
+    # O to_sql padrão grava com as configurações conservadoras do SQLite e sem índices. Para grandes volumes, a carga em massa:
+    # 1. Ajusta PRAGMAs apenas durante a carga: WAL, synchronous=OFF (sem fsync a cada escrita) e um cache maior (valor negativo = KiB).
+    # 2. Cria a tabela com tipos declarados e insere em lotes (executemany) dentro de uma única transação.
+    # 3. Cria os índices só depois da inserção, o que é muito mais barato do que mantê-los atualizados linha a linha.
+    # Ao final as PRAGMAs voltam aos valores anteriores (journal_mode fica gravado no arquivo, então restaurá-lo é obrigatório).
+BULK_LOAD_PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'OFF', 'cache_size': -262144}
+BULK_INDEX_COLUMNS = ('App', 'Category', 'Last Updated')
+
+
+def _sqlite_column_type(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP'
+    return 'TEXT'
+
+
+def bulk_load_dataframe_to_db(df: pd.DataFrame, connection_string: str, table_name: str, if_exists: str = 'replace', batch_size: int = 50_000, index_columns: tuple = BULK_INDEX_COLUMNS) -> dict | None:
+
+    if df.empty:
+        logging.warning("DataFrame vazio recebido para carga, portanto sem ação.")
+        return None
+
+    logging.info(f"Iniciando carga em massa para a tabela '{table_name}' no banco de dados.")
+
+    engine = None
+    connection = None
+    previous_pragmas = {}
+
+    try:
+        engine = create_engine(connection_string)
+        connection = engine.raw_connection()
+        cursor = connection.cursor()
 
+        for pragma, value in BULK_LOAD_PRAGMAS.items():
+            previous_pragmas[pragma] = cursor.execute(f'PRAGMA {pragma}').fetchone()[0]
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+
+        columns = list(df.columns)
+        column_definitions = ', '.join(f'"{column}" {_sqlite_column_type(df[column].dtype)}' for column in columns)
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        insert_sql = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+
+        start = time.perf_counter()
+        cursor.execute('BEGIN')
+
+        if if_exists == 'replace':
+            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({column_definitions})')
+
+        # Com if_exists='append' (ex: chunks do modo streaming) a tabela já tem os índices da carga anterior.
+            # Eles são removidos antes da inserção e recriados depois; como tudo ocorre na mesma transação, um erro faz o rollback deles também.
+        indexes = {f"ix_{table_name}_{column.replace(' ', '_').lower()}": column for column in index_columns if column in columns}
+        for index_name in indexes:
+            cursor.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+
+        for batch_start in range(0, len(df), batch_size):
+            cursor.executemany(insert_sql, to_sqlite_records(df.iloc[batch_start:batch_start + batch_size]))
+
+        for index_name, column in indexes.items():
+            cursor.execute(f'CREATE INDEX "{index_name}" ON "{table_name}" ("{column}")')
+
+        connection.commit()
+        elapsed = time.perf_counter() - start
+
+        report = {'rows': len(df), 'seconds': round(elapsed, 4), 'rows_per_sec': round(len(df) / elapsed, 1) if elapsed else None}
+        logging.info(f"Carga em massa da tabela {table_name}: {report['rows']} linhas em {report['seconds']}s ({report['rows_per_sec']} linhas/s)")
+        return report
+
+    except Exception as e:
+        if connection is not None:
+            connection.rollback()
+        logging.error(f"Erro durante a carga em massa para o BD: {e}", exc_info=True)
+        return None
+
+    finally:
+        if connection is not None:
+            for pragma, value in previous_pragmas.items():
+                connection.cursor().execute(f'PRAGMA {pragma} = {value}')
+            connection.close()
+        if engine:
+            engine.dispose()
+            logging.info("Conexão com o banco de dados descartada")
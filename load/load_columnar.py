@@ -0,0 +1,135 @@
+import os
+import uuid
+import shutil
+import logging
+import pandas as pd
+
+# O pyarrow é uma dependência opcional: sem ele, o pipeline continua gravando apenas no SQLite.
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    from pyarrow import fs
+except ImportError:
+    pa = None
+
+
+# Conceito: Armazenamento colunar.
+    # No SQLite as linhas são gravadas inteiras, então ler só Category e Installs ainda percorre a tabela toda.
+    # Em Parquet (ou Arrow IPC) cada coluna é gravada separadamente: uma consulta lê apenas as colunas de que precisa.
+    # Além disso:
+    # - Particionamento por Category (pastas Category=GAME/, Category=TOOLS/...): filtros por categoria nem abrem os arquivos das outras.
+    # - Dicionário: textos repetidos (Category, Type, Genres...) são gravados uma vez e referenciados por códigos inteiros.
+    # - Compressão (zstd por padrão) reduz o volume lido do disco.
+COLUMNAR_FORMATS = {'parquet': 'parquet', 'arrow': 'ipc'}
+
+
+# Só vale a pena codificar como dicionário colunas com muitos valores repetidos (ex: Type, Genres); em colunas quase únicas (ex: App) o dicionário só aumenta o arquivo.
+def _dictionary_encode_strings(table: 'pa.Table', exclude: tuple = (), max_distinct_ratio: float = 0.5) -> 'pa.Table':
+    for i, column in enumerate(table.schema):
+        if column.name in exclude or not pa.types.is_string(column.type):
+            continue
+        if pc.count_distinct(table.column(i)).as_py() <= max_distinct_ratio * table.num_rows:
+            table = table.set_column(i, column.name, pc.dictionary_encode(table.column(i)))
+    return table
+
+
+def _dataset_path(output_dir: str, dataset_name: str, file_format: str) -> str:
+    return os.path.abspath(os.path.join(output_dir, f"{dataset_name}.{file_format}"))
+
+
+# Conceito: Schema estável entre cargas.
+    # Cada chamada converte um DataFrame diferente (ex: um chunk do modo streaming), e o tipo Arrow de uma coluna depende dos dados:
+    # um chunk pode ter Current Ver como texto e outro como dicionário, ou índices de dicionário int8 em um e int16 em outro.
+    # Arquivos com schemas diferentes no mesmo dataset fazem a leitura falhar (ArrowInvalid). Por isso:
+    # - Na primeira gravação, o schema é salvo em _common_metadata na raiz do dataset (convenção do Parquet; arquivos iniciados por "_" são ignorados na leitura),
+    #   com os índices dos dicionários alargados para int32, para que chunks posteriores com mais valores distintos ainda caibam.
+    # - Nas gravações com if_exists='append', a tabela é convertida (cast) para esse schema antes de ser gravada.
+SCHEMA_FILE_NAME = '_common_metadata'
+
+
+def _conform_schema(table: 'pa.Table', dataset_path: str, if_exists: str) -> 'pa.Table':
+    schema_path = os.path.join(dataset_path, SCHEMA_FILE_NAME)
+    if if_exists == 'append' and os.path.exists(schema_path):
+        return table.cast(pq.read_schema(schema_path))
+
+    fields = [field.with_type(pa.dictionary(pa.int32(), field.type.value_type)) if pa.types.is_dictionary(field.type) else field for field in table.schema]
+    table = table.cast(pa.schema(fields, metadata=table.schema.metadata))
+    os.makedirs(dataset_path, exist_ok=True)
+    pq.write_metadata(table.schema, schema_path)
+    return table
+
+
+def load_dataframe_to_columnar(df: pd.DataFrame, output_dir: str, dataset_name: str, file_format: str = 'parquet', partition_cols: tuple = ('Category',), compression: str = 'zstd', if_exists: str = 'replace') -> str | None:
+
+    if pa is None:
+        logging.error("pyarrow não está instalado; a saída colunar não será gerada (pip install pyarrow).")
+        return None
+
+    if df.empty:
+        logging.warning("DataFrame vazio recebido para carga, portanto sem ação.")
+        return None
+
+    if file_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Formato colunar desconhecido: {file_format}. Opções: {tuple(COLUMNAR_FORMATS)}")
+
+    dataset_path = _dataset_path(output_dir, dataset_name, file_format)
+    logging.info(f"Iniciando carga colunar ({file_format}) em '{dataset_path}'.")
+
+    try:
+        if if_exists == 'replace' and os.path.exists(dataset_path):
+            shutil.rmtree(dataset_path)
+
+        partition_cols = [column for column in partition_cols if column in df.columns]
+        # A coluna de partição vira nome de pasta, então ela não é codificada como dicionário.
+        table = _dictionary_encode_strings(pa.Table.from_pandas(df, preserve_index=False), exclude=tuple(partition_cols))
+        table = _conform_schema(table, dataset_path, if_exists)
+
+        dataset_format = ds.ParquetFileFormat() if file_format == 'parquet' else ds.IpcFileFormat()
+        if file_format == 'parquet':
+            file_options = dataset_format.make_write_options(compression=compression, use_dictionary=True)
+        else:
+            file_options = dataset_format.make_write_options(compression=compression)
+
+        # Um nome de arquivo único por chamada permite anexar novos arquivos (ex: chunks do modo streaming) sem sobrescrever os anteriores.
+        ds.write_dataset(
+            table,
+            dataset_path,
+            format=dataset_format,
+            file_options=file_options,
+            partitioning=partition_cols or None,
+            partitioning_flavor='hive' if partition_cols else None,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.{file_format}",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+        logging.info(f"Dados gravados com sucesso em {dataset_path}")
+        return dataset_path
+
+    except Exception as e:
+        logging.error(f"Erro durante a carga colunar: {e}", exc_info=True)
+        return None
+
+
+# Leitura para consumidores: apenas as colunas pedidas são lidas, os filtros descartam partições inteiras
+    # e os arquivos são mapeados em memória (mmap), evitando cópias do disco para a memória do processo.
+    # filters aceita uma expressão do pyarrow ou a lista de tuplas do pandas, ex: [('Category', '==', 'GAME')].
+def read_columnar(output_dir: str, dataset_name: str, columns: list[str] | None = None, filters=None, file_format: str = 'parquet') -> pd.DataFrame | None:
+
+    if pa is None:
+        logging.error("pyarrow não está instalado; não é possível ler a saída colunar (pip install pyarrow).")
+        return None
+
+    dataset_path = _dataset_path(output_dir, dataset_name, file_format)
+    dataset = ds.dataset(
+        dataset_path,
+        format=COLUMNAR_FORMATS[file_format],
+        partitioning='hive',
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+
+    return dataset.to_table(columns=columns, filter=filters).to_pandas()
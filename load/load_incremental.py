@@ -0,0 +1,115 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine
+import logging
+
+from load.load_SQLite import to_sqlite_records
+
+
+# Conceito: Change Data Capture (CDC).
+    # Em vez de apagar e reescrever a tabela a cada execução (if_exists='replace'), cada linha recebe:
+    # _row_key: chave da linha (colunas-chave + número da ocorrência, pois o CSV repete o mesmo app em várias linhas).
+    # _row_hash: hash do conteúdo da linha. Se o hash mudou, a linha mudou.
+    # Comparando chaves e hashes novos com os gravados na tabela, só o delta (novas, alteradas e removidas) é aplicado ao banco.
+ROW_KEY_COLUMN = '_row_key'
+ROW_HASH_COLUMN = '_row_hash'
+
+
+def add_cdc_columns(df: pd.DataFrame, key_columns: list[str]) -> pd.DataFrame:
+    row_key = df[key_columns[0]].astype(str)
+    for column in key_columns[1:]:
+        row_key = row_key + '|' + df[column].astype(str)
+
+    # Linhas com a mesma chave são diferenciadas pela ordem em que aparecem (0, 1, 2...).
+    occurrence = df.groupby(key_columns, dropna=False, sort=False, observed=True).cumcount()
+    row_key = row_key + '#' + occurrence.astype(str)
+
+    # hash_pandas_object devolve uint64; o SQLite armazena inteiros com sinal, então os mesmos 64 bits são lidos como int64.
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy().view(np.int64)
+
+    return df.assign(**{ROW_KEY_COLUMN: row_key.to_numpy(), ROW_HASH_COLUMN: row_hash})
+
+
+def _table_columns(conn, table_name: str) -> list[str]:
+    return [row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table_name}")')]
+
+
+def _upsert_sql(table_name: str, columns: list[str]) -> str:
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    placeholders = ', '.join('?' for _ in columns)
+    updates = ', '.join(f'"{column}" = excluded."{column}"' for column in columns if column != ROW_KEY_COLUMN)
+
+    return (
+        f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders}) '
+        f'ON CONFLICT("{ROW_KEY_COLUMN}") DO UPDATE SET {updates}'
+    )
+
+
+def _full_load(conn, df_cdc: pd.DataFrame, table_name: str) -> None:
+    df_cdc.to_sql(table_name, conn, if_exists='replace', index=False)
+    conn.exec_driver_sql(f'CREATE UNIQUE INDEX "ux_{table_name}{ROW_KEY_COLUMN}" ON "{table_name}" ("{ROW_KEY_COLUMN}")')
+
+
+# Carga incremental: o DataFrame recebido é o retrato completo (snapshot) da tabela; somente as diferenças em relação ao banco são gravadas.
+    # Todas as alterações (DELETE + UPSERT) acontecem em uma única transação: ou o delta inteiro é aplicado, ou nada muda.
+    # Se a tabela ainda não existe, ou foi criada sem as colunas de CDC, ou o schema mudou, é feita uma carga completa inicial.
+def load_dataframe_incremental(df: pd.DataFrame, connection_string: str, table_name: str, key_columns: list[str]) -> dict | None:
+
+    if df.empty:
+        logging.warning("DataFrame vazio recebido para carga, portanto sem ação.")
+        return None
+
+    logging.info(f"Iniciando carga incremental para a tabela '{table_name}' (chave: {key_columns}).")
+
+    engine = None
+
+    try:
+        engine = create_engine(connection_string)
+        df_cdc = add_cdc_columns(df, key_columns)
+
+        with engine.begin() as conn:
+            if _table_columns(conn, table_name) != list(df_cdc.columns):
+                logging.info(f"Tabela '{table_name}' inexistente ou com schema diferente; realizando carga completa.")
+                _full_load(conn, df_cdc, table_name)
+                report = {'inserted': len(df_cdc), 'updated': 0, 'deleted': 0, 'unchanged': 0}
+                logging.info(f"Carga incremental da tabela {table_name}: {report}")
+                return report
+
+            df_existing = pd.read_sql(f'SELECT "{ROW_KEY_COLUMN}", "{ROW_HASH_COLUMN}" FROM "{table_name}"', conn)
+
+            df_delta = df_cdc[[ROW_KEY_COLUMN, ROW_HASH_COLUMN]].merge(
+                df_existing, on=ROW_KEY_COLUMN, how='outer', suffixes=('', '_db'), indicator=True
+            )
+            is_new = df_delta['_merge'] == 'left_only'
+            is_deleted = df_delta['_merge'] == 'right_only'
+            is_changed = (df_delta['_merge'] == 'both') & (df_delta[ROW_HASH_COLUMN] != df_delta[f'{ROW_HASH_COLUMN}_db'])
+
+            deleted_keys = df_delta.loc[is_deleted, ROW_KEY_COLUMN]
+            if not deleted_keys.empty:
+                conn.exec_driver_sql(
+                    f'DELETE FROM "{table_name}" WHERE "{ROW_KEY_COLUMN}" = ?',
+                    [(key,) for key in deleted_keys],
+                )
+
+            upsert_keys = df_delta.loc[is_new | is_changed, ROW_KEY_COLUMN]
+            df_upsert = df_cdc[df_cdc[ROW_KEY_COLUMN].isin(upsert_keys)]
+            if not df_upsert.empty:
+                conn.exec_driver_sql(_upsert_sql(table_name, list(df_upsert.columns)), to_sqlite_records(df_upsert))
+
+        report = {
+            'inserted': int(is_new.sum()),
+            'updated': int(is_changed.sum()),
+            'deleted': int(is_deleted.sum()),
+            'unchanged': int(len(df_cdc) - is_new.sum() - is_changed.sum()),
+        }
+        logging.info(f"Carga incremental da tabela {table_name}: {report}")
+        return report
+
+    except Exception as e:
+        logging.error(f"Erro durante a carga incremental para o BD: {e}", exc_info=True)
+        return None
+
+    finally:
+        if engine:
+            engine.dispose()
+            logging.info("Conexão com o banco de dados descartada")
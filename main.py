@@ -1,5 +1,7 @@
 import os
 import logging
+import argparse
+from functools import partial
 import pandas as pd
 from tabulate import tabulate
 from sqlalchemy import create_engine
@@ -8,81 +10,322 @@ from sqlalchemy import create_engine
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Conceito: As instruções from ... import ... são como você "pega emprestado" as funções que você definiu em outros arquivos (.py) para usá-las aqui.
-# Ipomrtações extract_data do seu módulo de extração.
-from extract.extract_csv import extract_data
+# Ipomrtações do seu módulo de extração.
+from extract.extract_csv import PARSER_BACKENDS
+from extract.sources import expand_sources, extract_sources
 from transform.transform import transform_google_play_apps, transform_user_reviews, aggregate_reviews, unify_dataframes
-from load.load_SQLite import load_dataframe_to_db
+from transform.transform import compute_apps_medians, partial_aggregate_reviews, merge_review_partials, finalize_review_partials
+from transform.join_index import unify_dataframes_indexed, unify_with_key_index, load_app_key_index, save_app_key_index, deduplicate_apps_by_name, DEDUP_POLICIES
+from transform.dtypes import build_app_dictionary, optimize_apps_dtypes, optimize_reviews_dtypes
+from load.load_SQLite import load_dataframe_to_db, bulk_load_dataframe_to_db
+from load.load_incremental import load_dataframe_incremental
+from load.load_columnar import load_dataframe_to_columnar
+from pipeline.dag import Stage, run_dag
+from pipeline.cache import StageCache
+from pipeline.metrics import MetricsRecorder, PROFILE_MODES, collect_counts
+
+
+# Chaves usadas na carga incremental: apps são identificados pelo nome e pelo "retrato" (versão + data de atualização), reviews agregadas apenas pelo nome do app.
+INCREMENTAL_KEYS = {
+    'googleplaystore_apps_silver': ['App', 'Current Ver', 'Last Updated'],
+    'googleplaystore_user_reviews_silver': ['App'],
+    'googleplay_data': ['App', 'Current Ver', 'Last Updated'],
+}
+
+
+# Etapas cujo resultado depende apenas das entradas e do código (ver pipeline.cache).
+CACHEABLE_STAGES = ('extract_apps', 'extract_reviews', 'transform_apps', 'transform_reviews', 'aggregate_reviews', 'app_dictionary', 'optimize_apps', 'optimize_reviews', 'unify')
+
+
+# Modo streaming: mínimo de linhas de parciais de reviews acumuladas antes de somá-las ao total (ver run_streaming_etl_pipeline).
+REVIEW_MERGE_MIN_ROWS = 100_000
+# Modo streaming com deduplicação: mínimo de linhas de apps acumuladas antes de deduplicá-las junto com os apps já escolhidos.
+APPS_DEDUP_MIN_ROWS = 100_000
+# Modo streaming com optimize_dtypes: tipo fixo (anulável) das contagens, o mesmo em todos os chunks (ver transform.dtypes._downcast_count).
+    # Inteiro com sinal de 64 bits, como o INTEGER do SQLite (o to_sql do pandas não aceita uint64).
+STREAMING_COUNT_DTYPE = 'Int64'
+
+
+# load_mode: 'replace' reescreve a tabela inteira (comportamento original); 'incremental' aplica apenas o delta via UPSERT;
+    # 'bulk' usa a carga em massa (PRAGMAs ajustadas, lotes em uma transação e índices criados ao final).
+def load_table(df: pd.DataFrame, connection_string: str, table_name: str, load_mode: str = 'replace', if_exists: str = 'replace') -> None:
+    if load_mode == 'incremental':
+        load_dataframe_incremental(df, connection_string, table_name, INCREMENTAL_KEYS[table_name])
+    elif load_mode == 'bulk':
+        bulk_load_dataframe_to_db(df, connection_string, table_name, if_exists=if_exists)
+    else:
+        load_dataframe_to_db(df, connection_string, table_name, if_exists=if_exists)
 
 
 # Parâmetros de Entrada: A função recebe os caminhos dos arquivos (apps_file_path, reviews_file_path) e o diretório de saída (output_dir).
-def run_etl_pipeline(apps_file_path: str, reviews_file_path: str, output_dir: str):
+    # Cada caminho pode ser também uma lista de arquivos, pastas ou padrões glob (shards), comprimidos ou não (ver extract.sources).
+    # chunksize (opcional): ativa o modo streaming, em que os arquivos são processados em blocos de no máximo `chunksize` linhas.
+    # parser_backend (opcional): 'python', 'c' ou 'pyarrow' com schema declarado; linhas rejeitadas vão para output_dir/quarantine.
+    # load_mode: 'replace' (padrão), 'incremental' (CDC: grava apenas linhas novas, alteradas e removidas) ou 'bulk' (carga em massa com índices).
+    # max_workers: quantas etapas independentes podem rodar ao mesmo tempo; stage_workers: paralelismo interno por etapa ({nome_da_etapa: workers}).
+    # columnar_format (opcional): 'parquet' ou 'arrow' grava também a tabela unificada em formato colunar, particionada por Category.
+    # cache_dir (opcional): ativa o cache de etapas; execuções com as mesmas entradas e o mesmo código reaproveitam os resultados salvos.
+    # metrics_path (opcional): grava as métricas de cada etapa (tempos, linhas, memória, valores convertidos em NaN e linhas removidas) em JSON ou, com extensão .prom, no formato do Prometheus.
+    # profile_stage / profile_mode (opcionais): detalha uma etapa com 'cprofile' ou 'tracemalloc'; os relatórios vão para output_dir/profile.
+    # join_index_path (opcional): unifica pelo índice persistente de Apps (nome normalizado -> id), reaproveitado entre execuções;
+        # dedup_policy ('none', 'latest' ou 'most_reviews') escolhe uma única linha por app na tabela unificada.
+    # optimize_dtypes: converte as tabelas para tipos compactos (categorias, inteiros sem sinal, App com dicionário compartilhado) antes da unificação e da carga.
+def run_etl_pipeline(apps_file_path: str | list[str], reviews_file_path: str | list[str], output_dir: str, chunksize: int | None = None, parser_backend: str | None = None, load_mode: str = 'replace', max_workers: int = 4, stage_workers: dict | None = None, columnar_format: str | None = None, cache_dir: str | None = None, cache_max_bytes: int = 2 * 1024 ** 3, metrics_path: str | None = None, profile_stage: str | None = None, profile_mode: str = 'cprofile', optimize_dtypes: bool = False, join_index_path: str | None = None, dedup_policy: str = 'none'):
     logging.info("Iniciando o pipeline ETL...")
 
+    quarantine_dir = os.path.join(output_dir, 'quarantine')
 
-    # --- 1. Extração ---
-
-    # Chamada extract_data
-        # df_apps_raw, df_reviews_raw = extract_data(apps_file_path, reviews_file_path): Aqui, o main.py chama a função do módulo extract para obter os DataFrames brutos
-    logging.info("Passo 1: Extraindo dados brutos...")
-    df_apps_raw, df_reviews_raw = extract_data(apps_file_path, reviews_file_path)
+    metrics = None
+    if metrics_path or profile_stage:
+        metrics = MetricsRecorder(profile_stage=profile_stage, profile_mode=profile_mode, profile_dir=os.path.join(output_dir, 'profile'))
 
-    # Conceito: Esta é uma validação de "early exit"
-        # Se a extração falhar (e extract_data retornar None, None), o pipeline é interrompido aqui, evitando que as próximas etapas tentem processar dados inexistentes e gerem mais erros.
-    if df_apps_raw is None or df_reviews_raw is None:
-        logging.error("Falha na extração dos dados.")
+    if chunksize:
+        if load_mode == 'incremental':
+            logging.warning("O modo streaming grava os chunks com append; a carga incremental não é suportada e será usado o modo 'replace'.")
+            load_mode = 'replace'
+        run_streaming_etl_pipeline(apps_file_path, reviews_file_path, output_dir, chunksize, parser_backend=parser_backend, load_mode=load_mode, columnar_format=columnar_format, optimize_dtypes=optimize_dtypes, metrics=metrics, join_index_path=join_index_path, dedup_policy=dedup_policy)
+        if metrics and metrics_path:
+            metrics.export(metrics_path)
         return
 
 
-    # --- 2. Transformação ---
+    sqlite_db_path = os.path.join(output_dir, 'googleplay_data_silver.sqlite')
+    sqlite_conn_string = f"sqlite:///{sqlite_db_path}"
+
+    # As fontes são expandidas antes de montar o DAG: a lista de shards entra nos parâmetros das etapas (e na chave do cache),
+        # então um shard novo em uma pasta ou glob invalida a extração correspondente.
+    apps_sources = expand_sources(apps_file_path)
+    reviews_sources = expand_sources(reviews_file_path)
+
+    # Conceito: Orquestração por dependências (DAG).
+        # Em vez de uma sequência fixa, cada etapa declara as etapas de que depende (inputs), e o run_dag executa em paralelo tudo o que já está pronto:
+        # 1. Extração: apps e reviews são lidos ao mesmo tempo.
+        # 2. Transformação: o ramo de apps é transformado enquanto as reviews ainda são transformadas e agregadas (a agregação resolve a granularidade antes da unificação).
+        # 3. Carga: as tabelas silver são gravadas enquanto a unificação acontece. As cargas compartilham o recurso exclusivo 'sqlite',
+        #    pois o SQLite aceita um único escritor por vez.
+        # Se uma etapa falhar (exceção ou retorno None), as etapas que dependem dela são puladas, como o "early exit" da versão sequencial.
+        # Com optimize_dtypes, as etapas optimize_* ficam entre a transformação e a unificação/carga (apps_stage e reviews_stage).
+    apps_stage, reviews_stage = ('optimize_apps', 'optimize_reviews') if optimize_dtypes else ('transform_apps', 'aggregate_reviews')
+
+    stages = [
+        Stage('extract_apps', extract_sources, kwargs={'sources': apps_sources, 'kind': 'apps', 'parser_backend': parser_backend, 'quarantine_dir': quarantine_dir}),
+        Stage('extract_reviews', extract_sources, kwargs={'sources': reviews_sources, 'kind': 'reviews', 'parser_backend': parser_backend, 'quarantine_dir': quarantine_dir}),
+        Stage('transform_apps', transform_google_play_apps, inputs=('extract_apps',)),
+        Stage('transform_reviews', transform_user_reviews, inputs=('extract_reviews',)),
+        Stage('aggregate_reviews', aggregate_reviews, inputs=('transform_reviews',)),
+        Stage('unify', unify_dataframes, inputs=(apps_stage, reviews_stage)),
+        Stage('load_apps', load_table, inputs=(apps_stage,), kwargs={'connection_string': sqlite_conn_string, 'table_name': 'googleplaystore_apps_silver', 'load_mode': load_mode}, exclusive='sqlite'),
+        Stage('load_reviews', load_table, inputs=(reviews_stage,), kwargs={'connection_string': sqlite_conn_string, 'table_name': 'googleplaystore_user_reviews_silver', 'load_mode': load_mode}, exclusive='sqlite'),
+        Stage('load_unified', load_table, inputs=('unify',), kwargs={'connection_string': sqlite_conn_string, 'table_name': 'googleplay_data', 'load_mode': load_mode}, exclusive='sqlite'),
+    ]
+
+    # Com o índice de Apps (ou uma política de deduplicação), a unificação passa a usar a junção por ids.
+    if join_index_path or dedup_policy != 'none':
+        unify_stage = next(stage for stage in stages if stage.name == 'unify')
+        unify_stage.func = unify_dataframes_indexed
+        unify_stage.kwargs = {'index_path': join_index_path, 'dedup_policy': dedup_policy}
+
+    if optimize_dtypes:
+        stages += [
+            Stage('app_dictionary', build_app_dictionary, inputs=('transform_apps', 'aggregate_reviews')),
+            Stage('optimize_apps', optimize_apps_dtypes, inputs=('transform_apps', 'app_dictionary')),
+            Stage('optimize_reviews', optimize_reviews_dtypes, inputs=('aggregate_reviews', 'app_dictionary')),
+        ]
+
+    # A saída colunar não usa o SQLite, então é gravada em paralelo com a carga da tabela unificada.
+    if columnar_format:
+        stages.append(Stage('export_columnar', load_dataframe_to_columnar, inputs=('unify',), kwargs={'output_dir': output_dir, 'dataset_name': 'googleplay_data', 'file_format': columnar_format}))
+
+    # Extração, transformações e unificação são determinísticas e podem ser reaproveitadas; as cargas sempre executam.
+    if cache_dir:
+        cache = StageCache(cache_dir, max_bytes=cache_max_bytes)
+        for stage in stages:
+            if stage.name in CACHEABLE_STAGES:
+                stage.func = cache.wrap(stage.name, stage.func)
 
-    # Conceito: Novamente, o main.py orquestra as chamadas, passando o resultado de uma etapa para a próxima
-        # Chamadas de Transformação:
-            # df_apps_transformed = transform_google_play_apps(df_apps_raw): O main.py chama a função de transformação para os dados de aplicativos.
-            # df_reviews_transformed = transform_user_reviews(df_reviews_raw): E, em seguida, para os dados de reviews.
+    # A instrumentação envolve a função já com cache, então um acerto de cache aparece nas métricas como uma etapa rápida.
+    if metrics:
+        for stage in stages:
+            stage.func = metrics.wrap(stage.name, stage.func)
 
-    logging.info("Passo 2: Transformando dados...")
-    df_apps_transformed = transform_google_play_apps(df_apps_raw)
-    df_reviews_transformed = transform_user_reviews(df_reviews_raw)
+    # stage_workers permite configurar o paralelismo interno de etapas específicas (repassado como argumento `workers`).
+        # Nomes desconhecidos são rejeitados aqui; etapas cuja função não aceita workers são rejeitadas pelo run_dag antes de executar qualquer etapa.
+    unknown_stages = sorted(set(stage_workers or {}) - {stage.name for stage in stages})
+    if unknown_stages:
+        raise ValueError(f"stage_workers cita etapas inexistentes: {unknown_stages}. Etapas: {[stage.name for stage in stages]}")
+    for stage in stages:
+        if stage_workers and stage.name in stage_workers:
+            stage.workers = stage_workers[stage.name]
 
-    if df_apps_transformed is None or df_reviews_transformed is None:
-        logging.error("Falha na transformação dos dados. Encerrando o pipeline ETL.")
+    results, timings = run_dag(stages, max_workers=max_workers, keep=('unify',))
+
+    for name, elapsed in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        logging.info(f"Tempo da etapa {name}: {elapsed:.3f}s")
+
+    if metrics and metrics_path:
+        metrics.export(metrics_path)
+
+    if 'unify' not in results:
+        logging.error("Falha no pipeline ETL. Verifique as etapas com erro acima.")
         return
 
-    logging.info(f"Transformação de apps e reviews concluída.")
+    logging.info("Pipeline ETL concluído com sucesso!")
+
+
+# A passada das medianas relê o arquivo de apps: as linhas rejeitadas já são contadas (e gravadas na quarentena) na passada principal,
+    # então as contagens registradas durante a leitura de cada chunk desta passada são descartadas.
+def _without_counts(chunks):
+    chunks = iter(chunks)
+    while True:
+        with collect_counts({}):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
 
-    # Conceito: Resolver a granularidade aqui é fundamental para a qualidade da análise no Power BI.
-        # Agregação de Reviews:
-            # df_reviews_aggregated = aggregate_reviews(df_reviews_transformed): 
-            # Esta linha é crucial. O main.py chama a função aggregate_reviews (do módulo transform) para resumir os dados de reviews antes de qualquer unificação ou carga final.
 
-    df_reviews_aggregated = aggregate_reviews(df_reviews_transformed)
+# Conceito: Pipeline em streaming.
+    # Mesmo resultado de run_etl_pipeline, mas nunca mantém um arquivo inteiro em memória:
+    # 1. Uma primeira passada pelo arquivo de apps calcula as medianas globais de Rating e Size.
+    # 2. Reviews são transformadas chunk a chunk e reduzidas a parciais (somas e contagens) por app, cujo tamanho depende do número de apps.
+    # 3. Apps são transformados chunk a chunk com as medianas globais; cada chunk é anexado (append) à tabela silver e, já unificado, à tabela googleplay_data.
+    # metrics (opcional): MetricsRecorder que mede cada chamada por chunk com os mesmos nomes de etapa do DAG (apps_medians é a primeira passada).
+    # join_index_path / dedup_policy: como em run_etl_pipeline. Com deduplicação, a tabela unificada só pode ser gravada depois do último chunk:
+        # os apps escolhidos até o momento ficam em memória (uma linha por app, o tamanho da própria tabela unificada) e são unificados de uma vez no final.
+        # O índice persistente é carregado uma vez antes dos chunks, atualizado em memória a cada chunk e gravado uma única vez no final.
+def run_streaming_etl_pipeline(apps_file_path: str | list[str], reviews_file_path: str | list[str], output_dir: str, chunksize: int, parser_backend: str | None = None, load_mode: str = 'replace', columnar_format: str | None = None, optimize_dtypes: bool = False, metrics: MetricsRecorder | None = None, join_index_path: str | None = None, dedup_policy: str = 'none'):
+    logging.info(f"Executando o pipeline em modo streaming (chunks de {chunksize} linhas)...")
 
+    def instrument(stage_name: str, func):
+        return metrics.wrap(stage_name, func) if metrics else func
+
+    def instrument_chunks(stage_name: str, chunks):
+        return metrics.wrap_chunks(stage_name, chunks) if metrics and chunks is not None else chunks
+
+    transform_apps = instrument('transform_apps', transform_google_play_apps)
+    transform_reviews = instrument('transform_reviews', transform_user_reviews)
+    aggregate_partials = instrument('aggregate_reviews', partial_aggregate_reviews)
+    merge_partials = instrument('aggregate_reviews', merge_review_partials)
+    finalize_partials = instrument('aggregate_reviews', finalize_review_partials)
+    optimize_apps = instrument('optimize_apps', partial(optimize_apps_dtypes, count_dtype=STREAMING_COUNT_DTYPE))
+    optimize_reviews = instrument('optimize_reviews', partial(optimize_reviews_dtypes, count_dtype=STREAMING_COUNT_DTYPE))
+    unify = instrument('unify', unify_dataframes)
+    key_index, key_index_changed = None, False
+    if join_index_path or dedup_policy != 'none':
+        key_index = load_app_key_index(join_index_path)
+
+        def unify_chunk(df_apps: pd.DataFrame, df_reviews: pd.DataFrame) -> pd.DataFrame:
+            nonlocal key_index, key_index_changed
+            result = unify_with_key_index(df_apps, df_reviews, key_index)
+            if result is None:
+                return None
+            df_unified, key_index, added = result
+            key_index_changed = key_index_changed or added > 0
+            return df_unified
+
+        unify = instrument('unify', unify_chunk)
+    deduplicate = instrument('unify', deduplicate_apps_by_name)
+    load_apps = instrument('load_apps', load_table)
+    load_reviews = instrument('load_reviews', load_table)
+    load_unified = instrument('load_unified', load_table)
+    export_columnar = instrument('export_columnar', load_dataframe_to_columnar)
 
-    # --- 3. Carga no banco de dados SQLite ---
-    
     sqlite_db_path = os.path.join(output_dir, 'googleplay_data_silver.sqlite')
     sqlite_conn_string = f"sqlite:///{sqlite_db_path}"
 
-    logging.info("Passo 3: Carregando dados transformados para o banco de dados (SQLite)...")
-    
-    # Chamada para carregar a tabela de apps
+    logging.info("Passo 1: Abrindo leitores em chunks...")
+    quarantine_dir = os.path.join(output_dir, 'quarantine')
+    apps_chunks = instrument_chunks('extract_apps', extract_sources(apps_file_path, 'apps', chunksize=chunksize, parser_backend=parser_backend, quarantine_dir=quarantine_dir))
+    reviews_chunks = instrument_chunks('extract_reviews', extract_sources(reviews_file_path, 'reviews', chunksize=chunksize, parser_backend=parser_backend, quarantine_dir=quarantine_dir))
+
+    if apps_chunks is None or reviews_chunks is None:
+        logging.error("Falha na extração dos dados.")
+        return
+
+    logging.info("Passo 2: Calculando medianas globais (primeira passada)...")
+    median_chunks = extract_sources(apps_file_path, 'apps', chunksize=chunksize, parser_backend=parser_backend)
+    rating_median, size_median = instrument('apps_medians', compute_apps_medians)(_without_counts(median_chunks))
+
+    logging.info("Passo 3: Transformando e agregando reviews por chunk...")
+    # Os parciais de cada chunk ficam em um buffer e só são somados ao acumulado quando o buffer alcança o tamanho do acumulado
+        # (ou REVIEW_MERGE_MIN_ROWS): cada linha é reagrupada um número constante de vezes, em vez de uma vez por chunk.
+    review_partials = None
+    pending_partials, pending_rows = [], 0
+    for df_reviews_chunk in reviews_chunks:
+        df_reviews_transformed = transform_reviews(df_reviews_chunk)
+        chunk_partials = aggregate_partials(df_reviews_transformed)
+        pending_partials.append(chunk_partials)
+        pending_rows += len(chunk_partials)
+        if pending_rows >= max(REVIEW_MERGE_MIN_ROWS, len(review_partials) if review_partials is not None else 0):
+            review_partials = merge_partials([review_partials] + pending_partials)
+            pending_partials, pending_rows = [], 0
+
+    if pending_partials:
+        review_partials = merge_partials([review_partials] + pending_partials)
+
+    if review_partials is None:
+        logging.error("Nenhuma review foi extraída. Encerrando o pipeline ETL.")
+        return
+
+    df_reviews_aggregated = finalize_partials(review_partials)
+    # Em streaming o dicionário de Apps não é compartilhado (exigiria ler o arquivo de apps inteiro antes); cada lado recebe apenas categorias próprias.
+    if optimize_dtypes:
+        df_reviews_aggregated = optimize_reviews(df_reviews_aggregated)
+    load_reviews(df_reviews_aggregated, sqlite_conn_string, "googleplaystore_user_reviews_silver", load_mode)
+
+    logging.info("Passo 4: Transformando, unificando e carregando apps por chunk...")
     apps_table_name = "googleplaystore_apps_silver"
-    load_dataframe_to_db(df_apps_transformed, sqlite_conn_string, apps_table_name)
-    
-    # Chamada para carregar a tabela de reviews
-    reviews_table_name = "googleplaystore_user_reviews_silver"
-    load_dataframe_to_db(df_reviews_aggregated, sqlite_conn_string, reviews_table_name)
-    
-     # Chamada para carregar a tabela unificada
-    logging.info("Carregando tabela unificada...")
-    df_unified = unify_dataframes(df_apps_transformed, df_reviews_aggregated)
-
-    if df_unified is not None:
-        load_dataframe_to_db(df_unified, sqlite_conn_string, 'googleplay_data')
-    else:
-        logging.error("Falha ao unificar os DataFrames. A tabela unificada não será criada.")
-    
-    logging.info("Pipeline ETL concluído com sucesso!")
+    # A primeira carga de cada tabela substitui o conteúdo anterior; as seguintes apenas anexam.
+    if_exists = 'replace'
+    # Com deduplicação, os chunks transformados ficam em um buffer que é deduplicado junto com os apps já escolhidos quando alcança o tamanho deles
+        # (como os parciais de reviews). A ordem das linhas é mantida, então os empates ficam com a primeira linha do arquivo, como no DAG.
+    df_apps_kept = None
+    pending_apps, pending_rows = [], 0
+    for df_apps_chunk in apps_chunks:
+        df_apps_transformed = transform_apps(df_apps_chunk, rating_median=rating_median, size_median=size_median)
+        if df_apps_transformed.empty:
+            continue
+        if dedup_policy != 'none':
+            pending_apps.append(df_apps_transformed)
+            pending_rows += len(df_apps_transformed)
+            if pending_rows >= max(APPS_DEDUP_MIN_ROWS, len(df_apps_kept) if df_apps_kept is not None else 0):
+                df_apps_kept = deduplicate(pd.concat([df_apps_kept] + pending_apps), dedup_policy)
+                pending_apps, pending_rows = [], 0
+        if optimize_dtypes:
+            df_apps_transformed = optimize_apps(df_apps_transformed)
+
+        load_apps(df_apps_transformed, sqlite_conn_string, apps_table_name, load_mode, if_exists=if_exists)
+
+        if dedup_policy == 'none':
+            df_unified = unify(df_apps_transformed, df_reviews_aggregated)
+            if df_unified is None:
+                logging.error("Falha ao unificar os DataFrames. A tabela unificada não será criada.")
+                return
+            load_unified(df_unified, sqlite_conn_string, 'googleplay_data', load_mode, if_exists=if_exists)
+            if columnar_format:
+                export_columnar(df_unified, output_dir, 'googleplay_data', file_format=columnar_format, if_exists=if_exists)
+
+        if_exists = 'append'
+
+    if pending_apps:
+        df_apps_kept = deduplicate(pd.concat([df_apps_kept] + pending_apps), dedup_policy)
+
+    if df_apps_kept is not None:
+        logging.info("Passo 5: Unificando e carregando os apps deduplicados...")
+        if optimize_dtypes:
+            df_apps_kept = optimize_apps(df_apps_kept)
+        df_unified = unify(df_apps_kept, df_reviews_aggregated)
+        if df_unified is None:
+            logging.error("Falha ao unificar os DataFrames. A tabela unificada não será criada.")
+            return
+        load_unified(df_unified, sqlite_conn_string, 'googleplay_data', load_mode)
+        if columnar_format:
+            export_columnar(df_unified, output_dir, 'googleplay_data', file_format=columnar_format)
+
+    if join_index_path and key_index_changed:
+        save_app_key_index(key_index, join_index_path)
+
+    logging.info("Pipeline ETL (streaming) concluído com sucesso!")
 
 
 # Então, if __name__ == "__main__": literalmente se traduz como: 
@@ -103,18 +346,53 @@ def run_etl_pipeline(apps_file_path: str, reviews_file_path: str, output_dir: st
     # 3. Modularidade: Se outro script (talvez um futuro dashboard ou um verificador de qualidade de dados) quisesse importar uma função específica dos seus módulos extract.py ou transform.py (por exemplo, from transform.transform import transform_google_play_apps), ele poderia fazê-lo sem executar automaticamente todo o pipeline ETL definido em main.py. Isso mantém seu projeto limpo e evita execuções desnecessárias.
 
 
+# Ponto de entrada por linha de comando: as fontes de entrada e o diretório de saída vêm dos argumentos, sem caminhos fixos no código.
+    # Exemplo: python main.py --apps googleplaystore.csv --reviews "drops/*/reviews_*.csv.gz" --output output
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pipeline ETL Google Play Store (apps + reviews) para SQLite.")
+    parser.add_argument('--apps', nargs='+', default=['googleplaystore.csv'], help="Arquivos, pastas ou padrões glob com os apps (aceita .gz, .bz2, .xz e .zst).")
+    parser.add_argument('--reviews', nargs='+', default=['googleplaystore_user_reviews.csv'], help="Arquivos, pastas ou padrões glob com as reviews (ex: um arquivo por região).")
+    parser.add_argument('--output', default='output', help="Diretório de saída (banco SQLite, quarentena, cache e métricas).")
+    parser.add_argument('--chunksize', type=int, help="Ativa o modo streaming com chunks deste tamanho.")
+    parser.add_argument('--parser-backend', choices=PARSER_BACKENDS, help="Parser com schema declarado; 'c' ou 'pyarrow' aproveitam melhor a leitura paralela dos shards.")
+    parser.add_argument('--load-mode', choices=('replace', 'incremental', 'bulk'), default='replace')
+    parser.add_argument('--max-workers', type=int, default=4, help="Etapas do pipeline executadas ao mesmo tempo.")
+    parser.add_argument('--extract-workers', type=int, help="Shards lidos ao mesmo tempo em cada etapa de extração.")
+    parser.add_argument('--columnar-format', choices=('parquet', 'arrow'))
+    parser.add_argument('--no-cache', action='store_true', help="Desativa o cache de etapas.")
+    parser.add_argument('--metrics', help="Arquivo de métricas (.json ou .prom). Padrão: <output>/metrics.json.")
+    parser.add_argument('--profile-stage', help="Etapa detalhada pelo profiler (ex: transform_apps); o relatório vai para <output>/profile.")
+    parser.add_argument('--profile-mode', choices=PROFILE_MODES, default='cprofile', help="'cprofile' (tempo por função) ou 'tracemalloc' (memória alocada por linha).")
+    parser.add_argument('--no-optimize-dtypes', action='store_true', help="Mantém os tipos originais (sem categorias e inteiros compactos).")
+    parser.add_argument('--dedup-policy', choices=DEDUP_POLICIES, default='none', help="Padrão 'none' mantém todas as linhas, como o pipeline original; 'latest' ou 'most_reviews' deixam uma linha por app na tabela unificada (opt-in).")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
     # --- Configurações ---
-    apps_csv_path = r'C:\Users\HP\Documents\projects\teste_tecnico\googleplaystore.csv'
-    reviews_csv_path = r'C:\Users\HP\Documents\projects\teste_tecnico\googleplaystore_user_reviews.csv'
-    output_folder = r'C:\Users\HP\Documents\projects\teste_tecnico\output'
+    args = parse_args()
+    output_folder = args.output
 
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
         logging.info(f"Diretório de saída '{output_folder}' criado.")
 
+    extract_workers = args.extract_workers
     run_etl_pipeline(
-        apps_file_path=apps_csv_path,
-        reviews_file_path=reviews_csv_path,
+        apps_file_path=args.apps,
+        reviews_file_path=args.reviews,
         output_dir=output_folder,
+        chunksize=args.chunksize,
+        parser_backend=args.parser_backend,
+        load_mode=args.load_mode,
+        max_workers=args.max_workers,
+        stage_workers={'extract_apps': extract_workers, 'extract_reviews': extract_workers} if extract_workers else None,
+        columnar_format=args.columnar_format,
+        cache_dir=None if args.no_cache else os.path.join(output_folder, '.cache'),
+        metrics_path=args.metrics or os.path.join(output_folder, 'metrics.json'),
+        profile_stage=args.profile_stage,
+        profile_mode=args.profile_mode,
+        optimize_dtypes=not args.no_optimize_dtypes,
+        join_index_path=os.path.join(output_folder, 'app_key_index.pkl'),
+        dedup_policy=args.dedup_policy,
     )
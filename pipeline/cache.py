@@ -0,0 +1,266 @@
+import os
+import time
+import pickle
+import hashlib
+import inspect
+import logging
+import weakref
+import threading
+import contextvars
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from pipeline.metrics import record_count, collect_counts
+
+
+# Conceito: Cache endereçado por conteúdo.
+    # A chave de cada etapa é o hash de tudo o que determina o seu resultado: o conteúdo das entradas (arquivo ou DataFrame),
+    # os parâmetros e a versão do código (hash dos pacotes do projeto e do arquivo-fonte da função). Se nada disso mudou, o resultado salvo é reaproveitado.
+    # Como cada etapa só enxerga as próprias entradas, alterar o CSV de reviews invalida apenas as etapas do ramo de reviews (e a unificação).
+    # Os resultados são gravados com pickle protocolo 5 (buffers binários dos arrays, sem conversão para texto);
+    # quando o diretório passa de max_bytes, os arquivos usados há mais tempo são removidos (LRU).
+PICKLE_PROTOCOL = 5
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Parâmetros que mudam só a forma de executar (ex: paralelismo), e não o resultado, ficam fora da chave.
+IGNORED_KWARGS = ('workers',)
+
+# Arquivos que a própria etapa grava (ex: o índice de Apps da unificação) entram na chave pelo caminho, e não pelo conteúdo;
+    # pelo conteúdo, cada execução mudaria a chave da execução seguinte e a etapa nunca seria reaproveitada.
+PATH_KWARGS = ('index_path',)
+
+# Uma etapa depende também das funções e constantes (schemas, regras de validação) de outros módulos,
+    # então a versão do código é o hash de todos os arquivos .py destes pacotes, e não só do arquivo da função.
+CODE_PACKAGES = ('extract', 'transform', 'load', 'pipeline')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Efeitos colaterais da etapa em execução: arquivos gravados além do resultado (ex: quarentena), informados com record_output_file.
+    # Em um acerto de cache a função não executa, então esses arquivos e as contagens de record_count são salvos com o resultado e reproduzidos.
+_current_outputs = contextvars.ContextVar('stage_outputs', default=None)
+
+# Impressões digitais já calculadas, por objeto: um DataFrame produzido (ou lido do cache) por uma etapa herda a chave dessa etapa,
+    # então a etapa seguinte não precisa recalcular o hash do DataFrame inteiro.
+    # Pressupõe que as etapas não alteram os DataFrames recebidos (as funções de transformação trabalham sobre cópias).
+_known_fingerprints = {}
+
+
+def file_fingerprint(file_path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    known = _known_fingerprints.get(id(df))
+    if known is not None and known[0]() is df:
+        return known[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Index (ex: o dicionário de apps de transform.dtypes), Series e arrays numpy também entram na chave pelo conteúdo:
+    # o repr deles é truncado ("...") e faria objetos diferentes gerarem a mesma chave.
+def array_fingerprint(value: pd.Index | pd.Series | np.ndarray) -> str:
+    known = _known_fingerprints.get(id(value))
+    if known is not None and known[0]() is value:
+        return known[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(value, np.ndarray):
+        digest.update(f"ndarray:{value.dtype}:{value.shape}".encode())
+        digest.update(pd.util.hash_array(value.ravel()).tobytes())
+    else:
+        digest.update(f"{type(value).__name__}:{value.dtype}:{value.name!r}".encode())
+        digest.update(pd.util.hash_pandas_object(value, index=isinstance(value, pd.Series)).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _remember_fingerprint(value, fingerprint: str) -> None:
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        _known_fingerprints[id(value)] = (weakref.ref(value), fingerprint)
+        # Quando o DataFrame é liberado da memória, a entrada também sai do dicionário.
+        weakref.finalize(value, _known_fingerprints.pop, id(value), None)
+
+
+# Chamada pelas funções do pipeline depois de gravar um arquivo auxiliar; fora de uma etapa com cache não faz nada.
+def record_output_file(path: str) -> None:
+    outputs = _current_outputs.get()
+    if outputs is not None:
+        outputs.add(os.path.abspath(path))
+
+
+@lru_cache(maxsize=None)
+def _packages_version() -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for package in CODE_PACKAGES:
+        for root, dirs, files in sorted(os.walk(os.path.join(PROJECT_DIR, package))):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, PROJECT_DIR).encode())
+                    with open(path, 'rb') as file:
+                        digest.update(file.read())
+    return digest.hexdigest()
+
+
+def code_version(func) -> str:
+    source_file = inspect.getsourcefile(func)
+    with open(source_file, 'rb') as file:
+        return hashlib.blake2b(file.read() + _packages_version().encode(), digest_size=16).hexdigest()
+
+
+def _fingerprint(value) -> str:
+    if isinstance(value, pd.DataFrame):
+        return frame_fingerprint(value)
+    if isinstance(value, str) and os.path.isfile(value):
+        return f"file:{file_fingerprint(value)}"
+    if isinstance(value, (pd.Series, pd.Index, np.ndarray)):
+        return array_fingerprint(value)
+    # Listas de arquivos (ex: shards de extract.sources) usam o conteúdo de cada arquivo.
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_fingerprint(item) for item in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ','.join(f"{key!r}:{_fingerprint(item)}" for key, item in sorted(value.items(), key=lambda entry: repr(entry[0]))) + '}'
+    # Só valores simples, cujo repr é completo, entram na chave pelo repr; qualquer outro tipo geraria chaves ambíguas.
+    if value is None or isinstance(value, (str, int, float, bool, np.generic)):
+        return repr(value)
+    raise TypeError(f"Cache: tipo sem impressão digital definida: {type(value).__name__}")
+
+
+class StageCache:
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # O lock não é serializável; ao enviar o cache para outro processo (executor 'process' do DAG), um lock novo é criado lá.
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, stage_name: str, func, args: tuple, kwargs: dict) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(stage_name.encode())
+        digest.update(code_version(func).encode())
+        for value in args:
+            digest.update(_fingerprint(value).encode())
+        for name in sorted(kwargs):
+            if name in IGNORED_KWARGS:
+                continue
+            value = repr(kwargs[name]) if name in PATH_KWARGS else _fingerprint(kwargs[name])
+            digest.update(f"{name}={value}".encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key: str) -> tuple[bool, object]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+        # Atualiza a data de acesso usada pela política LRU.
+        os.utime(path)
+        return True, value
+
+    def put(self, key: str, value) -> None:
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            pickle.dump(value, file, protocol=PICKLE_PROTOCOL)
+        # os.replace é atômico: uma leitura concorrente nunca encontra um arquivo pela metade.
+        os.replace(temp_path, path)
+        self._evict()
+
+    # Etapas paralelas do DAG podem gravar no cache ao mesmo tempo, então a limpeza é feita sob um lock.
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+                logging.info(f"Cache: entrada {name} removida (LRU).")
+
+    # Envolve uma função de etapa: devolve o resultado salvo quando a chave já existe, senão executa e salva.
+    # Resultados None (falha, pela convenção do projeto) nunca são salvos.
+    def wrap(self, stage_name: str, func) -> 'CachedStage':
+        return CachedStage(self, stage_name, func)
+
+
+class CachedStage:
+
+    def __init__(self, cache: StageCache, stage_name: str, func):
+        self.cache = cache
+        self.stage_name = stage_name
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        key = self.cache.key(self.stage_name, self.func, args, kwargs)
+
+        hit, entry = self.cache.get(key)
+        if hit:
+            logging.info(f"Cache: etapa '{self.stage_name}' reaproveitada ({key[:12]}).")
+            _restore_outputs(entry['files'])
+        else:
+            start = time.perf_counter()
+            entry = self._run(args, kwargs)
+            if entry['value'] is not None:
+                self.cache.put(key, entry)
+                logging.info(f"Cache: etapa '{self.stage_name}' executada e salva em {time.perf_counter() - start:.3f}s ({key[:12]}).")
+
+        for event, count in entry['counts'].items():
+            record_count(event, count)
+
+        value = entry['value']
+        _remember_fingerprint(value, key)
+        return value
+
+    # Executa a função coletando as contagens (record_count) e os arquivos gravados (record_output_file), guardados junto com o resultado.
+    def _run(self, args: tuple, kwargs: dict) -> dict:
+        counts, outputs = {}, set()
+        outputs_token = _current_outputs.set(outputs)
+        try:
+            with collect_counts(counts):
+                value = self.func(*args, **kwargs)
+        finally:
+            _current_outputs.reset(outputs_token)
+
+        files = {}
+        for path in sorted(outputs):
+            with open(path, 'rb') as file:
+                files[path] = file.read()
+        return {'value': value, 'counts': counts, 'files': files}
+
+
+def _restore_outputs(files: dict) -> None:
+    for path, content in files.items():
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(content)
+        os.replace(temp_path, path)
+        logging.info(f"Cache: arquivo {path} restaurado.")
@@ -0,0 +1,157 @@
+import logging
+import time
+import inspect
+from dataclasses import dataclass, field
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+# Conceito: Pipeline como grafo (DAG - Directed Acyclic Graph).
+    # Cada etapa declara de quais outras etapas depende (inputs). Etapas sem dependência entre si, como o ramo de apps e o ramo de reviews,
+    # rodam ao mesmo tempo em um pool de threads (ou processos), e o tempo total se aproxima do caminho crítico em vez da soma de todas as etapas.
+@dataclass
+class Stage:
+    name: str
+    func: Callable
+    # Nomes das etapas cujos resultados são passados, nesta ordem, como argumentos posicionais para func.
+    inputs: tuple[str, ...] = ()
+    kwargs: dict = field(default_factory=dict)
+    # Quando definido, é repassado para func como o argumento `workers` (paralelismo interno da etapa).
+    workers: int | None = None
+    # Etapas com o mesmo recurso exclusivo nunca rodam ao mesmo tempo (ex: escritas no mesmo arquivo SQLite).
+    exclusive: str | None = None
+
+
+def _run_stage(func: Callable, args: tuple, kwargs: dict) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# Etapas com cache ou métricas são objetos que envolvem a função original (atributo func); vale a assinatura da função original.
+def _accepts_workers(func: Callable) -> bool:
+    while not inspect.isfunction(func) and hasattr(func, 'func'):
+        func = func.func
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return True
+    return 'workers' in parameters or any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values())
+
+
+def _validate(stages: list[Stage]) -> None:
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError("Nomes de etapas duplicados no pipeline.")
+
+    known = set(names)
+    for stage in stages:
+        missing = [name for name in stage.inputs if name not in known]
+        if missing:
+            raise ValueError(f"Etapa '{stage.name}' depende de etapas inexistentes: {missing}")
+        if stage.workers is not None and not _accepts_workers(stage.func):
+            raise ValueError(f"Etapa '{stage.name}' não aceita o argumento workers (stage_workers).")
+
+    # Ordenação topológica (algoritmo de Kahn): se sobrar alguma etapa, o grafo tem ciclo.
+    pending = {stage.name: set(stage.inputs) for stage in stages}
+    while pending:
+        ready = [name for name, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Ciclo detectado entre as etapas: {sorted(pending)}")
+        for name in ready:
+            del pending[name]
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+
+# Conceito: Liberação antecipada de resultados intermediários.
+    # Cada resultado fica em memória só até a última etapa que o consome terminar (com sucesso, falha ou sendo pulada).
+    # Assim o pico de memória não acumula todos os DataFrames intermediários (extract, transform, optimize...) até o fim do pipeline.
+def _release_inputs(stage: Stage, remaining_consumers: dict, results: dict, keep: tuple) -> None:
+    for dep in stage.inputs:
+        remaining_consumers[dep] -= 1
+        if remaining_consumers[dep] == 0 and dep not in keep:
+            results.pop(dep, None)
+
+
+# Executa o DAG e devolve (resultados, tempos) por nome de etapa.
+    # Seguindo a convenção do projeto, uma etapa que lança exceção ou devolve None é considerada falha, e as etapas que dependem dela são puladas.
+    # executor: 'thread' (padrão; pandas, parsers e SQLite liberam o GIL nas partes pesadas) ou 'process' (funções e resultados precisam ser serializáveis).
+    # Os resultados devolvidos são os das etapas finais (sem consumidores) e os das etapas listadas em keep; os demais são liberados durante a execução.
+def run_dag(stages: list[Stage], max_workers: int = 4, executor: str = 'thread', keep: tuple = ()) -> tuple[dict, dict]:
+    _validate(stages)
+
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    pending = {stage.name: stage for stage in stages}
+    results = {}
+    completed = set()
+    remaining_consumers = {stage.name: 0 for stage in stages}
+    for stage in stages:
+        for dep in stage.inputs:
+            remaining_consumers[dep] += 1
+    timings = {}
+    failed = set()
+    busy_resources = set()
+    running = {}
+
+    logging.info(f"Executando pipeline com {len(stages)} etapas ({executor}, até {max_workers} em paralelo)...")
+    start = time.perf_counter()
+
+    with pool_class(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep in failed for dep in stage.inputs):
+                    logging.error(f"Etapa '{name}' ignorada: uma das entradas {stage.inputs} falhou.")
+                    failed.add(name)
+                    del pending[name]
+                    _release_inputs(stage, remaining_consumers, results, keep)
+                    continue
+
+                if not all(dep in completed for dep in stage.inputs):
+                    continue
+                if stage.exclusive and stage.exclusive in busy_resources:
+                    continue
+
+                kwargs = dict(stage.kwargs)
+                if stage.workers is not None:
+                    kwargs['workers'] = stage.workers
+                args = tuple(results[dep] for dep in stage.inputs)
+
+                logging.info(f"Etapa '{name}' iniciada.")
+                running[pool.submit(_run_stage, stage.func, args, kwargs)] = stage
+                if stage.exclusive:
+                    busy_resources.add(stage.exclusive)
+                del pending[name]
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                busy_resources.discard(stage.exclusive)
+                _release_inputs(stage, remaining_consumers, results, keep)
+
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    logging.error(f"Etapa '{stage.name}' falhou: {e}", exc_info=True)
+                    failed.add(stage.name)
+                    continue
+
+                timings[stage.name] = elapsed
+                logging.info(f"Etapa '{stage.name}' concluída em {elapsed:.3f}s.")
+
+                # Etapas de carga não devolvem nada; só é falha um None consumido por outra etapa.
+                if result is None and any(stage.name in other.inputs for other in stages):
+                    logging.error(f"Etapa '{stage.name}' não produziu resultado.")
+                    failed.add(stage.name)
+                    continue
+                completed.add(stage.name)
+                # Se todos os consumidores já foram pulados (outra entrada deles falhou), o resultado não precisa ser guardado.
+                if remaining_consumers[stage.name] or stage.name in keep or not any(stage.name in other.inputs for other in stages):
+                    results[stage.name] = result
+
+    wall = time.perf_counter() - start
+    logging.info(f"Pipeline concluído em {wall:.3f}s (soma das etapas: {sum(timings.values()):.3f}s).")
+    return results, timings
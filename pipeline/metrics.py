@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import time
+import pstats
+import logging
+import cProfile
+import threading
+import contextvars
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+
+
+# Conceito: Instrumentação por etapa.
+    # Cada função de extração, transformação e carga é envolvida por um InstrumentedStage, que mede:
+    # - tempo de parede e tempo de CPU (da thread que executa a etapa; processos filhos, como os da agregação particionada, não entram na conta);
+    # - linhas de entrada (soma dos DataFrames recebidos) e de saída (DataFrame devolvido);
+    # - variação do pico de memória residente (RSS) durante a etapa, em relação ao RSS no início;
+    # - contagens de qualidade informadas pelas próprias funções com record_count (valores convertidos em NaN, linhas removidas, quarentena).
+    # Com etapas rodando em paralelo, o RSS é do processo inteiro: a variação de uma etapa inclui o que as etapas simultâneas alocaram.
+    # No modo streaming a mesma etapa roda uma vez por chunk; a exportação soma as chamadas de cada etapa (calls = número de chamadas).
+    # O resultado é exportado em JSON ou no formato texto do Prometheus (node_exporter textfile collector).
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+METRICS_FORMATS = ('json', 'prometheus')
+
+# Contagens da etapa em execução. Cada thread do DAG executa uma etapa por vez, então cada uma enxerga apenas o próprio dicionário.
+    # Uma etapa pode repassar o contexto para threads próprias (ex: leitura de shards em extract.sources), daí o lock.
+_current_counts = contextvars.ContextVar('stage_counts', default=None)
+_counts_lock = threading.Lock()
+
+
+# Chamada pelas funções do pipeline para registrar perdas e conversões (ex: record_count('coerced.Installs', 3)).
+    # Fora de uma etapa instrumentada não faz nada, então as funções continuam utilizáveis isoladamente.
+def record_count(event: str, count) -> None:
+    counts = _current_counts.get()
+    if counts is None:
+        return
+    with _counts_lock:
+        counts[event] = counts.get(event, 0) + int(count)
+
+
+# Dentro do bloco, as contagens vão para `counts` em vez da etapa externa (ex: o cache guarda as contagens junto com o resultado).
+@contextmanager
+def collect_counts(counts: dict):
+    token = _current_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _current_counts.reset(token)
+
+
+def count_coerced(before: pd.Series, after: pd.Series) -> int:
+    # Valores presentes na entrada que a conversão (errors='coerce') transformou em NaN/NaT.
+    return int((before.notna() & after.isna()).sum())
+
+
+def current_rss_bytes() -> int | None:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Mede o pico de RSS de um trecho de código amostrando /proc/self/statm em uma thread.
+    # Fora do Linux, usa o pico do processo inteiro informado por resource.getrusage (não isola o trecho).
+class PeakRss:
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes() or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> 'PeakRss':
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.start = self.peak = rss
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, current_rss_bytes() or 0)
+            return
+
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss é informado em KiB no Linux e em bytes no macOS.
+        self.peak = max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    @property
+    def delta(self) -> int:
+        return max(self.peak - self.start, 0)
+
+
+def _count_rows(values) -> int | None:
+    frames = [value for value in values if isinstance(value, pd.DataFrame)]
+    if not frames:
+        return None
+    return sum(len(frame) for frame in frames)
+
+
+class MetricsRecorder:
+
+    # profile_stage (opcional): nome de uma etapa cujo caminho quente é detalhado com cProfile (funções mais demoradas)
+        # ou tracemalloc (linhas que mais alocaram memória); o relatório é gravado em profile_dir.
+    def __init__(self, profile_stage: str | None = None, profile_mode: str = 'cprofile', profile_dir: str | None = None):
+        if profile_mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de profiling desconhecido: {profile_mode}. Opções: {PROFILE_MODES}")
+
+        self.profile_stage = profile_stage
+        self.profile_mode = profile_mode
+        self.profile_dir = profile_dir or '.'
+        self.records = []
+        self._lock = threading.Lock()
+        self._profilers = {}
+
+    def wrap(self, stage_name: str, func) -> 'InstrumentedStage':
+        return InstrumentedStage(self, stage_name, func)
+
+    # Modo streaming: a leitura de cada chunk de `chunks` é medida como uma chamada da etapa (parsing, linhas lidas, quarentena).
+    def wrap_chunks(self, stage_name: str, chunks):
+        chunks = iter(chunks)
+        read_chunk = self.wrap(stage_name, next)
+        while True:
+            chunk = read_chunk(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+
+        counts = ', '.join(f"{event}={count}" for event, count in record['counts'].items())
+        logging.info(
+            f"Métricas da etapa '{record['stage']}': {record['wall_seconds']:.3f}s parede, {record['cpu_seconds']:.3f}s CPU, "
+            f"linhas {record['rows_in']} -> {record['rows_out']}, +{record['peak_rss_delta_mb']} MB" + (f", {counts}" if counts else "")
+        )
+
+    # Um registro por etapa: tempos, linhas e contagens somados; success só se todas as chamadas terminaram sem exceção; pico de memória é o maior.
+    def summary(self) -> list[dict]:
+        stages = {}
+        for record in self.records:
+            total = stages.get(record['stage'])
+            if total is None:
+                stages[record['stage']] = dict(record, counts=dict(record['counts']), calls=1)
+                continue
+
+            total['calls'] += 1
+            total['success'] = total['success'] and record['success']
+            for field in ('wall_seconds', 'cpu_seconds'):
+                total[field] = round(total[field] + record[field], 4)
+            for field in ('rows_in', 'rows_out'):
+                if record[field] is not None:
+                    total[field] = (total[field] or 0) + record[field]
+            total['peak_rss_delta_bytes'] = max(total['peak_rss_delta_bytes'], record['peak_rss_delta_bytes'])
+            total['peak_rss_delta_mb'] = round(total['peak_rss_delta_bytes'] / 1024 ** 2, 1)
+            for event, count in record['counts'].items():
+                total['counts'][event] = total['counts'].get(event, 0) + count
+
+        return list(stages.values())
+
+    def to_json(self, path: str) -> None:
+        report = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'stages': self.summary()}
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    # Formato texto do Prometheus: uma série por métrica e etapa; as contagens de qualidade viram a série etl_stage_rows_total com o rótulo event.
+    def to_prometheus(self, path: str) -> None:
+        gauges = {
+            'etl_stage_wall_seconds': ('wall_seconds', "Tempo de parede da etapa em segundos."),
+            'etl_stage_cpu_seconds': ('cpu_seconds', "Tempo de CPU da etapa em segundos."),
+            'etl_stage_rows_in': ('rows_in', "Linhas recebidas pela etapa."),
+            'etl_stage_rows_out': ('rows_out', "Linhas produzidas pela etapa."),
+            'etl_stage_peak_rss_delta_bytes': ('peak_rss_delta_bytes', "Aumento do pico de memória residente durante a etapa."),
+            'etl_stage_success': ('success', "1 se a etapa terminou sem exceção."),
+            'etl_stage_calls': ('calls', "Chamadas da etapa (uma por chunk no modo streaming)."),
+        }
+
+        records = self.summary()
+        lines = []
+        for metric, (field, help_text) in gauges.items():
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for record in records:
+                value = record[field]
+                if value is not None:
+                    lines.append(f'{metric}{{stage="{record["stage"]}"}} {float(value)}')
+
+        lines += ["# HELP etl_stage_rows_total Linhas convertidas em nulo, removidas ou enviadas para a quarentena, por evento.", "# TYPE etl_stage_rows_total gauge"]
+        for record in records:
+            for event, count in record['counts'].items():
+                lines.append(f'etl_stage_rows_total{{stage="{record["stage"]}",event="{event}"}} {count}')
+
+        with open(path, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+
+    def export(self, path: str, metrics_format: str | None = None) -> None:
+        metrics_format = metrics_format or ('prometheus' if path.endswith('.prom') else 'json')
+        if metrics_format not in METRICS_FORMATS:
+            raise ValueError(f"Formato de métricas desconhecido: {metrics_format}. Opções: {METRICS_FORMATS}")
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if metrics_format == 'prometheus':
+            self.to_prometheus(path)
+        else:
+            self.to_json(path)
+        logging.info(f"Métricas das etapas gravadas em {path}")
+
+    def _profile(self, stage_name: str, func, args: tuple, kwargs: dict):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        report_path = os.path.join(self.profile_dir, f"{stage_name}_{self.profile_mode}.txt")
+
+        # Em streaming o perfil do cProfile acumula todas as chamadas da etapa; o do tracemalloc é o da última chamada.
+        if self.profile_mode == 'cprofile':
+            profiler = self._profilers.setdefault(stage_name, cProfile.Profile())
+            try:
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{stage_name}.prof"))
+                with open(report_path, 'w') as report:
+                    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(40)
+                logging.info(f"Perfil (cProfile) da etapa '{stage_name}' gravado em {report_path}")
+
+        # O tracemalloc é global: etapas que rodam ao mesmo tempo também aparecem no relatório.
+        tracemalloc.start(25)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(report_path, 'w') as report:
+                report.write(f"Memória rastreada: atual {current / 1024 ** 2:.1f} MB, pico {peak / 1024 ** 2:.1f} MB\n\n")
+                for stat in snapshot.statistics('lineno')[:40]:
+                    report.write(f"{stat}\n")
+            logging.info(f"Perfil (tracemalloc) da etapa '{stage_name}' gravado em {report_path}")
+
+
+# Funciona como o CachedStage: um objeto chamável que substitui a função da etapa no DAG.
+    # Exceções são registradas (success=False) e propagadas, para que o run_dag continue tratando a falha normalmente.
+class InstrumentedStage:
+
+    def __init__(self, recorder: MetricsRecorder, stage_name: str, func):
+        self.recorder = recorder
+        self.stage_name = stage_name
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        counts = {}
+        token = _current_counts.set(counts)
+        result = None
+        success = False
+
+        try:
+            with PeakRss() as rss:
+                wall_start = time.perf_counter()
+                cpu_start = time.thread_time()
+                if self.stage_name == self.recorder.profile_stage:
+                    result = self.recorder._profile(self.stage_name, self.func, args, kwargs)
+                else:
+                    result = self.func(*args, **kwargs)
+                success = True
+        finally:
+            cpu_seconds = time.thread_time() - cpu_start
+            wall_seconds = time.perf_counter() - wall_start
+            _current_counts.reset(token)
+
+            self.recorder.add({
+                'stage': self.stage_name,
+                'success': success,
+                'wall_seconds': round(wall_seconds, 4),
+                'cpu_seconds': round(cpu_seconds, 4),
+                'rows_in': _count_rows(list(args) + list(kwargs.values())),
+                'rows_out': _count_rows([result]),
+                'peak_rss_delta_bytes': rss.delta,
+                'peak_rss_delta_mb': round(rss.delta / 1024 ** 2, 1),
+                'counts': counts,
+            })
+
+        return result
@@ -0,0 +1,66 @@
+import os
+import glob
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.parquet as pq
+
+from main import run_etl_pipeline
+from load.load_columnar import read_columnar
+
+
+# Os chunks (de 4 linhas) foram montados para que o downcast por chunk gerasse tipos diferentes:
+    # o primeiro só tem contagens pequenas (uint8) e apps com reviews; o segundo tem contagens grandes (uint32) e apps sem reviews (nulos);
+    # o terceiro tem muitas versões distintas (Current Ver como texto em vez de dicionário).
+APPS = [
+    ('App A', 'GAME', 4.1, 10, '1.5M', '100+', 'Free', '0', 'Everyone', 'Action', 'January 7, 2018', '1.0', '4.1 and up'),
+    ('App B', 'GAME', 3.9, 20, '2M', '500+', 'Free', '0', 'Everyone', 'Action;Action & Adventure', 'January 8, 2018', '1.0', '4.1 and up'),
+    ('App C', 'TOOLS', 4.5, 30, '800k', '1,000+', 'Paid', '$0.99', 'Teen', 'Tools', 'March 1, 2017', '1.0', '4.0 and up'),
+    ('App D', 'TOOLS', None, 40, 'Varies with device', '1,000+', 'Free', '0', 'Everyone', 'Tools', 'March 2, 2017', '1.0', '4.0 and up'),
+    ('App E', 'GAME', 4.7, 3_000_000, '50M', '100,000,000+', 'Free', '0', 'Everyone', 'Casual', 'June 1, 2018', '2.0', '5.0 and up'),
+    ('App F', 'GAME', 4.2, 250_000, '30M', '10,000,000+', 'Free', '0', 'Teen', 'Casual', 'June 2, 2018', '2.0', '5.0 and up'),
+    ('App G', 'TOOLS', 4.0, 120_000, '12M', '1,000,000+', 'Free', '0', 'Everyone', 'Tools', 'June 3, 2018', '2.0', '5.0 and up'),
+    ('App H', 'TOOLS', 3.5, 70_000, '5M', '5,000,000+', 'Free', '0', 'Everyone', 'Tools', 'June 4, 2018', '2.0', '5.0 and up'),
+    ('App I', 'GAME', 4.4, 5, '3M', '50+', 'Free', '0', 'Everyone', 'Puzzle', 'May 1, 2016', '3.1.4', '4.4 and up'),
+    ('App J', 'GAME', 4.3, 6, '4M', '50+', 'Free', '0', 'Everyone', 'Puzzle', 'May 2, 2016', '3.1.5', '4.4 and up'),
+    ('App K', 'TOOLS', 4.6, 7, '6M', '50+', 'Free', '0', 'Everyone', 'Tools', 'May 3, 2016', '3.1.6', '4.4 and up'),
+    ('App L', 'TOOLS', 4.8, 8, '7M', '50+', 'Free', '0', 'Everyone', 'Tools', 'May 4, 2016', '3.1.7', '4.4 and up'),
+]
+APPS_COLUMNS = ['App', 'Category', 'Rating', 'Reviews', 'Size', 'Installs', 'Type', 'Price', 'Content Rating', 'Genres', 'Last Updated', 'Current Ver', 'Android Ver']
+REVIEWED_APPS = ['App A', 'App B', 'App C', 'App D', 'App I', 'App K']
+
+
+@pytest.fixture
+def sources(tmp_path):
+    apps_path = tmp_path / 'apps.csv'
+    reviews_path = tmp_path / 'reviews.csv'
+    pd.DataFrame(APPS, columns=APPS_COLUMNS).to_csv(apps_path, index=False)
+    pd.DataFrame({
+        'App': [app for app in REVIEWED_APPS for _ in range(3)],
+        'Translated_Review': 'Good app',
+        'Sentiment': ['Positive', 'Negative', 'Neutral'] * len(REVIEWED_APPS),
+        'Sentiment_Polarity': [0.5, -0.25, 0.0] * len(REVIEWED_APPS),
+        'Sentiment_Subjectivity': [0.6, 0.4, 0.1] * len(REVIEWED_APPS),
+    }).to_csv(reviews_path, index=False)
+    return str(apps_path), str(reviews_path)
+
+
+def test_streaming_optimized_parquet_reads_back(sources, tmp_path):
+    apps_path, reviews_path = sources
+    output_dir = str(tmp_path / 'output')
+    os.makedirs(output_dir)
+
+    run_etl_pipeline(apps_path, reviews_path, output_dir, chunksize=4, optimize_dtypes=True, columnar_format='parquet')
+
+    fragments = glob.glob(f"{output_dir}/googleplay_data.parquet/*/*.parquet")
+    assert len({pq.read_schema(fragment).remove_metadata() for fragment in fragments}) == 1
+
+    df = read_columnar(output_dir, 'googleplay_data')
+    assert len(df) == len(APPS)
+
+    df = df.set_index('App').sort_index()
+    assert df['Reviews'].tolist() == [app[3] for app in sorted(APPS)]
+    assert df.loc['App E', 'Installs'] == 100_000_000
+    assert df['Total_Reviews'].notna().sum() == len(REVIEWED_APPS)
+    assert df.loc[REVIEWED_APPS, 'Total_Reviews'].tolist() == [3] * len(REVIEWED_APPS)
@@ -0,0 +1,111 @@
+import logging
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+from pipeline.metrics import record_count, count_coerced
+
+
+# Conceito: Representação compacta em memória.
+    # Depois da transformação, boa parte das colunas ainda é object (um objeto Python por célula) e as contagens são int64.
+    # Esta etapa, aplicada antes da unificação e da carga, troca cada coluna pelo menor tipo que representa os mesmos valores:
+    # - Colunas com poucos valores distintos (Category, Type, Content Rating, Genres, Android Ver) viram category: códigos inteiros + uma tabela de textos.
+    # - Contagens (Reviews, Installs, Total_Reviews...) viram inteiros sem sinal do menor tamanho que comporta o maior valor.
+    # - App usa um dicionário compartilhado pelas duas tabelas (mesmas categorias dos dois lados), então o merge compara códigos inteiros em vez de textos.
+    # Os valores gravados no SQLite não mudam; apenas Reviews e Installs passam a ser gravados como INTEGER.
+    # Floats continuam float64 por padrão; downcast_floats=True usa float32 (menos memória, porém com arredondamento, ex: 4.99 -> 4.9899998).
+APPS_CATEGORY_COLUMNS = ('Category', 'Type', 'Content Rating', 'Genres', 'Android Ver')
+APPS_COUNT_COLUMNS = ('Reviews', 'Installs')
+REVIEWS_COUNT_COLUMNS = ('Total_Reviews', 'Positive_Reviews', 'Negative_Reviews', 'Neutral_Reviews')
+
+
+# Dicionário de Apps: a união dos nomes das duas tabelas, na ordem em que aparecem.
+    # Nomes são convertidos para texto como em unify_dataframes, para que um App nulo continue casando com "nan" do outro lado.
+def build_app_dictionary(*frames: pd.DataFrame) -> pd.Index:
+    names = pd.concat([frame['App'].astype(str) for frame in frames], ignore_index=True)
+    dictionary = pd.Index(names.unique(), name='App')
+    logging.info(f"Dicionário de Apps criado com {len(dictionary)} nomes ({dictionary.memory_usage(deep=True) / 1024 ** 2:.1f} MB, compartilhado pelas duas tabelas).")
+    return dictionary
+
+
+# count_dtype (opcional): um tipo inteiro fixo e anulável (ex: 'Int64') em vez do menor tipo que comporta os valores.
+    # No modo streaming cada chunk é otimizado separadamente; com o downcast, um chunk viraria uint16, outro uint32 e outro float (com nulos),
+    # e os arquivos anexados ao dataset colunar teriam schemas diferentes. Com o tipo fixo, todos os chunks têm o mesmo tipo.
+def _downcast_count(values: pd.Series, column: str, count_dtype: str | None = None) -> pd.Series:
+    numbers = pd.to_numeric(values, errors='coerce')
+    record_count(f'coerced.{column}', count_coerced(values, numbers))
+
+    # Só vira inteiro se não houver nulos (exceto com count_dtype, que é anulável), negativos ou frações; caso contrário mantém o float, sem perder informação.
+    if (count_dtype is None and numbers.isna().any()) or (numbers < 0).any() or (numbers % 1 != 0).any():
+        logging.warning(f"Coluna '{column}' tem valores nulos ou não inteiros; mantida como {numbers.dtype}.")
+        return numbers
+    if count_dtype is not None:
+        return numbers.astype(count_dtype)
+    return pd.to_numeric(numbers.astype(np.uint64), downcast='unsigned')
+
+
+def _downcast_floats(df: pd.DataFrame) -> pd.DataFrame:
+    float_columns = df.select_dtypes(include='float64').columns
+    return df.astype({column: 'float32' for column in float_columns})
+
+
+# Comparação de memória por coluna (memory_usage com deep=True conta também os textos apontados pelas colunas object).
+    # Em shared_columns (ex: App com o dicionário compartilhado) só os códigos são contados: o dicionário existe uma vez para as duas tabelas.
+def memory_report(df_before: pd.DataFrame, df_after: pd.DataFrame, shared_columns: tuple = ()) -> pd.DataFrame:
+    bytes_after = df_after.memory_usage(index=False, deep=True)
+    for column in shared_columns:
+        if column in df_after.columns and isinstance(df_after[column].dtype, pd.CategoricalDtype):
+            bytes_after[column] = df_after[column].cat.codes.nbytes
+
+    report = pd.DataFrame({
+        'dtype_before': df_before.dtypes.astype(str),
+        'dtype_after': df_after.dtypes.astype(str),
+        'bytes_before': df_before.memory_usage(index=False, deep=True),
+        'bytes_after': bytes_after,
+    })
+    report.loc['TOTAL', ['bytes_before', 'bytes_after']] = report[['bytes_before', 'bytes_after']].sum()
+    report['ratio'] = (report['bytes_before'] / report['bytes_after']).round(2)
+    return report
+
+
+def _log_memory_report(label: str, df_before: pd.DataFrame, df_after: pd.DataFrame, shared_columns: tuple = ()) -> None:
+    report = memory_report(df_before, df_after, shared_columns)
+    total = report.loc['TOTAL']
+    logging.info(f"Memória de {label}: {total['bytes_before'] / 1024 ** 2:.1f} MB -> {total['bytes_after'] / 1024 ** 2:.1f} MB ({total['ratio']}x menor).")
+    logging.debug("\n" + tabulate(report, headers='keys', tablefmt='github'))
+
+
+def _encode_apps(df: pd.DataFrame, app_dictionary: pd.Index | None) -> pd.DataFrame:
+    if app_dictionary is None:
+        return df.assign(App=df['App'].astype('category'))
+    return df.assign(App=pd.Categorical(df['App'].astype(str), categories=app_dictionary))
+
+
+def optimize_apps_dtypes(df_apps: pd.DataFrame, app_dictionary: pd.Index | None = None, downcast_floats: bool = False, count_dtype: str | None = None) -> pd.DataFrame:
+    logging.info("Otimizando os tipos do DataFrame de Apps...")
+
+    df_optimized = _encode_apps(df_apps, app_dictionary)
+    for column in APPS_CATEGORY_COLUMNS:
+        if column in df_optimized.columns:
+            df_optimized[column] = df_optimized[column].astype('category')
+    for column in APPS_COUNT_COLUMNS:
+        if column in df_optimized.columns:
+            df_optimized[column] = _downcast_count(df_optimized[column], column, count_dtype)
+    if downcast_floats:
+        df_optimized = _downcast_floats(df_optimized)
+
+    _log_memory_report('Apps', df_apps, df_optimized, shared_columns=('App',) if app_dictionary is not None else ())
+    return df_optimized
+
+
+def optimize_reviews_dtypes(df_reviews: pd.DataFrame, app_dictionary: pd.Index | None = None, downcast_floats: bool = False, count_dtype: str | None = None) -> pd.DataFrame:
+    logging.info("Otimizando os tipos do DataFrame de Reviews agregadas...")
+
+    df_optimized = _encode_apps(df_reviews, app_dictionary)
+    for column in REVIEWS_COUNT_COLUMNS:
+        if column in df_optimized.columns:
+            df_optimized[column] = _downcast_count(df_optimized[column], column, count_dtype)
+    if downcast_floats:
+        df_optimized = _downcast_floats(df_optimized)
+
+    _log_memory_report('Reviews agregadas', df_reviews, df_optimized, shared_columns=('App',) if app_dictionary is not None else ())
+    return df_optimized
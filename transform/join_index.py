@@ -0,0 +1,151 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+from pipeline.metrics import record_count
+
+
+# Conceito: Índice de chaves (surrogate keys).
+    # O merge por App compara textos e precisa montar uma tabela hash dos nomes a cada execução. Aqui cada nome normalizado
+    # (sem espaços extras e sem diferença de maiúsculas/minúsculas) recebe um id inteiro estável, salvo em disco e reaproveitado entre execuções:
+    # nomes novos recebem o próximo id e os antigos nunca mudam de id.
+    # A junção então é feita por endereçamento direto: um vetor "id -> linha da tabela de reviews" é indexado pelos ids dos apps,
+    # então o custo e a memória crescem linearmente com o catálogo, sem tabelas hash intermediárias.
+APP_ID_COLUMN = 'App_Id'
+
+# Política para apps repetidos (o CSV repete o mesmo app em várias categorias e "retratos"):
+    # 'none' mantém todas as linhas (comportamento de unify_dataframes); 'latest' mantém a linha com o Last Updated mais recente;
+    # 'most_reviews' mantém a linha com mais Reviews. Empates ficam com a primeira linha do arquivo.
+DEDUP_POLICIES = ('none', 'latest', 'most_reviews')
+
+
+def normalize_app_name(names: pd.Series) -> pd.Series:
+    return names.astype(str).str.strip().str.replace(r'\s+', ' ', regex=True).str.casefold()
+
+
+# Ids dos apps de uma coluna: cada nome distinto é normalizado e procurado no índice uma única vez, e o resultado é expandido pelos códigos.
+    # Se a coluna já é category (ex: dicionário compartilhado de transform.dtypes), os códigos existentes são reaproveitados.
+def _factorize_names(names: pd.Series) -> tuple[np.ndarray, pd.Series]:
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        codes, uniques = names.cat.codes.to_numpy(), names.cat.categories
+        # Um App nulo tem código -1, que indexaria a última categoria; ele vira uma categoria extra (nome "nan"), como no ramo abaixo.
+        if (codes < 0).any():
+            codes = np.where(codes < 0, len(uniques), codes)
+            uniques = uniques.append(pd.Index([np.nan]))
+    else:
+        # use_na_sentinel=False: um App nulo vira o nome "nan", como no astype(str) de unify_dataframes.
+        codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    return codes, normalize_app_name(pd.Series(uniques))
+
+
+def load_app_key_index(index_path: str | None) -> pd.Series:
+    if index_path and os.path.exists(index_path):
+        key_index = pd.read_pickle(index_path)
+        logging.info(f"Índice de Apps carregado de {index_path} ({len(key_index)} nomes).")
+        return key_index
+    return pd.Series(dtype='int64', index=pd.Index([], dtype=object, name='App_Key'), name=APP_ID_COLUMN)
+
+
+# Acrescenta ao índice os nomes ainda desconhecidos; devolve o índice atualizado e quantos nomes foram adicionados.
+def update_app_key_index(key_index: pd.Series, keys: pd.Series) -> tuple[pd.Series, int]:
+    new_keys = pd.Index(keys.unique()).difference(key_index.index, sort=False)
+    if new_keys.empty:
+        return key_index, 0
+
+    next_id = int(key_index.max()) + 1 if len(key_index) else 0
+    new_entries = pd.Series(np.arange(next_id, next_id + len(new_keys), dtype='int64'), index=new_keys, name=APP_ID_COLUMN)
+    key_index = pd.concat([key_index, new_entries])
+    key_index.index.name = 'App_Key'
+    return key_index, len(new_keys)
+
+
+def save_app_key_index(key_index: pd.Series, index_path: str) -> None:
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    key_index.to_pickle(temp_path, protocol=5)
+    # Mesmo cuidado do cache de etapas: a troca atômica evita que outra execução leia um índice pela metade.
+    os.replace(temp_path, index_path)
+    logging.info(f"Índice de Apps gravado em {index_path} ({len(key_index)} nomes).")
+
+
+def deduplicate_apps(df_apps: pd.DataFrame, app_ids: np.ndarray, policy: str = 'none') -> tuple[pd.DataFrame, np.ndarray]:
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Política de deduplicação desconhecida: {policy}. Opções: {DEDUP_POLICIES}")
+    if policy == 'none':
+        return df_apps, app_ids
+
+    if policy == 'latest':
+        priority = pd.to_datetime(df_apps['Last Updated'], errors='coerce')
+    else:
+        priority = pd.to_numeric(df_apps['Reviews'], errors='coerce')
+
+    # Ordenação estável pela prioridade (decrescente, nulos por último): a primeira linha de cada id é a escolhida.
+    order = pd.DataFrame({'id': app_ids, 'priority': priority.to_numpy()}).sort_values('priority', ascending=False, kind='stable', na_position='last')
+    keep = np.sort(order.drop_duplicates('id').index.to_numpy())
+
+    record_count(f'dropped.duplicate_app_{policy}', len(df_apps) - len(keep))
+    logging.info(f"Deduplicação de Apps ({policy}): {len(df_apps)} -> {len(keep)} linhas.")
+    return df_apps.iloc[keep], app_ids[keep]
+
+
+# Deduplicação sem o índice persistente: os ids vêm apenas dos nomes normalizados do próprio DataFrame.
+    # Usada no modo streaming, em que os apps chegam em chunks e a deduplicação é aplicada ao acumulado antes da junção.
+def deduplicate_apps_by_name(df_apps: pd.DataFrame, policy: str = 'none') -> pd.DataFrame:
+    codes, keys = _factorize_names(df_apps['App'])
+    key_ids = pd.factorize(keys)[0][codes]
+    return deduplicate_apps(df_apps, key_ids, policy)[0]
+
+
+# Junção à esquerda (apps + reviews agregadas) através do índice de chaves; mesmo formato de saída de unify_dataframes.
+    # index_path: arquivo do índice persistente (sem ele, o índice é montado em memória e descartado ao final).
+    # dedup_policy: ver DEDUP_POLICIES.
+def unify_dataframes_indexed(df_apps: pd.DataFrame, df_reviews: pd.DataFrame, index_path: str | None = None, dedup_policy: str = 'none') -> pd.DataFrame:
+    result = unify_with_key_index(df_apps, df_reviews, load_app_key_index(index_path), dedup_policy)
+    if result is None:
+        return None
+
+    df_unified, key_index, added = result
+    if index_path and added:
+        save_app_key_index(key_index, index_path)
+    return df_unified
+
+
+# Mesma junção, com um índice já carregado em memória; devolve (DataFrame unificado, índice atualizado, nomes adicionados).
+    # O modo streaming carrega o índice uma vez, repassa o índice atualizado de um chunk para o seguinte e só o grava no final.
+def unify_with_key_index(df_apps: pd.DataFrame, df_reviews: pd.DataFrame, key_index: pd.Series, dedup_policy: str = 'none') -> tuple[pd.DataFrame, pd.Series, int] | None:
+    logging.info("Iniciando a unificação dos DataFrames pelo índice de Apps...")
+
+    if 'App' not in df_apps.columns or 'App' not in df_reviews.columns:
+        logging.error("Erro: A coluna 'App' não está presente em um ou ambos os DataFrames. Não é possível unificar.")
+        return None
+
+    app_codes, app_keys = _factorize_names(df_apps['App'])
+    review_codes, review_keys = _factorize_names(df_reviews['App'])
+
+    key_index, added = update_app_key_index(key_index, pd.concat([app_keys, review_keys], ignore_index=True))
+
+    app_ids = key_index.reindex(app_keys).to_numpy()[app_codes]
+    review_ids = key_index.reindex(review_keys).to_numpy()[review_codes]
+
+    df_apps, app_ids = deduplicate_apps(df_apps, app_ids, dedup_policy)
+
+    # As reviews já vêm agregadas por App; se dois nomes diferentes viram a mesma chave normalizada, fica a primeira linha.
+    duplicated_reviews = pd.Series(review_ids).duplicated().to_numpy()
+    if duplicated_reviews.any():
+        logging.warning(f"{duplicated_reviews.sum()} app(s) de reviews com o mesmo nome normalizado; mantida a primeira ocorrência.")
+        record_count('dropped.duplicate_review_key', duplicated_reviews.sum())
+
+    # Vetor de endereçamento direto: review_position[id] é a linha das reviews daquele app, ou -1 se o app não tem reviews.
+    review_position = np.full(int(key_index.max()) + 1, -1, dtype=np.int64)
+    review_position[review_ids[~duplicated_reviews]] = np.flatnonzero(~duplicated_reviews)
+
+    # reindex com -1 (posição inexistente) produz linhas nulas, como o merge com how='left' faz para apps sem reviews.
+    df_reviews_body = df_reviews.drop(columns='App').reset_index(drop=True)
+    df_joined = df_reviews_body.reindex(review_position[app_ids])
+
+    df_unified = pd.concat([df_apps.reset_index(drop=True), df_joined.reset_index(drop=True)], axis=1)
+
+    logging.info("DataFrames unificados com sucesso.")
+    logging.info(f"DataFrame unificado tem {len(df_unified)} linhas e {len(df_unified.columns)} colunas.")
+
+    return df_unified, key_index, added
@@ -1,10 +1,74 @@
 import pandas as pd
 import numpy as np
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pipeline.metrics import record_count, count_coerced
+
+
+# Conceito: Encapsulamento de lógica complexa
+     #  Em vez de poluir o código principal com uma lógica de conversão, você criou uma pequena função auxiliar, facilitando o entendimento. 
+     #  Objetivo: Converter os valores da coluna Size para uma unidade numérica consistente (megabytes - MB) e tratar valores não numéricos.
+     #  Convert_size é uma ferramenta de limpeza e padronização que garante que a sua coluna de tamanho dos aplicativos seja numérica e consistente
+     #  Ela fica no nível do módulo para ser reaproveitada também pelo cálculo das medianas em modo streaming (compute_apps_medians).
+def convert_size(size):
+    if isinstance(size, str): # Verifica o Tipo de Dado: verifica se o valor na coluna Size é uma string (texto), necessária porque o script irá processar linha por linha, e alguns valores podem já estar em um formato numérico ou serem nulos
+        size = size.replace(',', '') # Remove Vírgulas: remove as vírgulas do texto, o que é um passo de limpeza fundamental para converter strings numéricas formatadas (ex: "1,000") em números.
+        if 'M' in size: # Lida com Unidades de Medida: Se a string contém 'M', a função remove o 'M' e converte o restante para um número decimal (megabytes).
+            return float(size.replace('M', ''))
+        elif 'k' in size: 
+            return float(size.replace('k', '')) / 1024
+        elif 'Varies with device' in size: # # Trata Valores Inconsistentes:  elif 'Varies with device' in size:Alguns aplicativos têm um tamanho que varia de acordo com o dispositivo. A função identifica este padrão e o converte para np.nan (Not a Number). Isso é crucial para que o valor seja tratado como um dado ausente e não cause um erro no cálculo da mediana, que é o próximo passo
+            return np.nan
+    return float(size) # Se o valor não se encaixa em nenhuma das condições acima (ou se o valor já era um número), a função o converte para o tipo float.
+
+
+# Conceito: Vetorização.
+    # .apply com funções Python executa o interpretador uma vez por linha; em milhões de linhas esse custo domina a transformação.
+    # As versões vetorizadas usam operações de string do pandas e aritmética do NumPy, que processam a coluna inteira de uma vez.
+    # O modo 'reference' mantém a implementação original linha a linha, útil para conferir que as duas produzem o mesmo resultado.
+TRANSFORM_MODES = ('vectorized', 'reference')
+
+# Tabela de multiplicadores por unidade: 'M' já está em megabytes e 'k' (kilobytes) é dividido por 1024. Sem unidade, o número é mantido.
+SIZE_UNIT_MULTIPLIERS = {'M': 1.0, 'k': 1 / 1024}
+
+
+def _check_mode(mode: str) -> None:
+    if mode not in TRANSFORM_MODES:
+        raise ValueError(f"Modo de transformação desconhecido: {mode}. Opções: {TRANSFORM_MODES}")
+
+
+# Conceito: Calcular sobre os valores distintos.
+    # Os métodos .str de colunas object ainda percorrem valor a valor em Python, então sozinhos não são mais rápidos que o .apply.
+    # Size, Installs, Price, Genres, Category e Last Updated têm poucos valores distintos: pd.factorize troca cada valor por um código,
+    # a função roda apenas sobre os distintos (mais um NaN no final) e o resultado volta para todas as linhas indexando pelos códigos.
+    # Nulos recebem o código -1, que em numpy aponta justamente para o último elemento, o resultado da função para NaN.
+    # Os distintos são montados como object, então .str funciona mesmo quando a coluna chega como float64 (ex: só nulos).
+def _map_unique(values: pd.Series, func) -> pd.Series:
+    codes, uniques = pd.factorize(values)
+    mapped = func(pd.Series(list(uniques) + [np.nan], dtype=object))
+    return pd.Series(mapped.to_numpy()[codes], index=values.index, name=values.name)
+
+
+# Versão vetorizada de convert_size: uma expressão regular separa o número da unidade e a tabela de multiplicadores faz a conversão.
+    # Valores que não casam com o padrão (ex: "Varies with device") viram NaN, assim como no convert_size original.
+def convert_size_vectorized(sizes: pd.Series) -> pd.Series:
+    return _map_unique(sizes, _convert_sizes)
+
+
+def _convert_sizes(sizes: pd.Series) -> pd.Series:
+    text = sizes.astype(str).str.replace(',', '', regex=False).str.strip()
+    parts = text.str.extract(r'^(?P<number>[\d.]+)(?P<unit>[Mk]?)$')
+
+    numbers = pd.to_numeric(parts['number'], errors='coerce')
+    multipliers = parts['unit'].map(SIZE_UNIT_MULTIPLIERS).fillna(1.0)
+    return numbers * multipliers
 
 
 # Esta função trata especificamente da tabela de aplicativos.
-def transform_google_play_apps(df_apps: pd.DataFrame) -> pd.DataFrame:
+    # Em modo streaming, rating_median e size_median chegam pré-calculados sobre o arquivo inteiro (ver compute_apps_medians), pois a mediana de um único chunk não é a mediana global.
+def transform_google_play_apps(df_apps: pd.DataFrame, rating_median: float | None = None, size_median: float | None = None, mode: str = 'vectorized') -> pd.DataFrame:
+    _check_mode(mode)
     logging.info("Iniciando transformação do DataFrame de Apps...")
 
     # Conceito: Imutabilidade.
@@ -14,50 +78,62 @@ def transform_google_play_apps(df_apps: pd.DataFrame) -> pd.DataFrame:
     # Conceito: Tratamento de valores ausentes (Missing Values).
         # fillna preenche os valores nulos na coluna Rating
         # A decisão de usar a median (mediana) é uma escolha estatística sólida, pois ela é menos sensível a outliers do que a média
-    df_apps_transformed['Rating'].fillna(df_apps_transformed['Rating'].median(), inplace=True)
+    if rating_median is None:
+        rating_median = df_apps_transformed['Rating'].median()
+    record_count('filled.Rating', df_apps_transformed['Rating'].isna().sum())
+    df_apps_transformed['Rating'].fillna(rating_median, inplace=True)
 
     # Conceito: Remoção de dados.
         # Remove linhas inteiras onde as colunas listadas (Type, Content Rating, etc.) têm valores ausentes
         # Função dropna remove linhas inteiras onde as colunas listadas (Type, Content Rating, etc.) têm valores ausentes
+    rows_before = len(df_apps_transformed)
     df_apps_transformed.dropna(subset=['Type', 'Content Rating', 'Current Ver', 'Android Ver'], inplace=True)
+    record_count('dropped.missing_values', rows_before - len(df_apps_transformed))
 
 
     # Conceito: Padronização e Limpeza.
         # .str.replace('+', '')  e pd.to_numeric(..., errors='coerce') Linhas de código como .str.replace('+', '') e pd.to_numeric(..., errors='coerce') são exemplos de limpeza de dados. Elas removem caracteres não numéricos e convertem a coluna para um tipo numérico. 
         # O parâmetro errors='coerce' é uma prática de segurança que transforma valores que não podem ser convertidos em números em NaN, que podem ser tratados posteriormente.
+    rows_before = len(df_apps_transformed)
     df_apps_transformed = df_apps_transformed[df_apps_transformed['Installs'] != 'Free']
-
-    df_apps_transformed['Installs'] = df_apps_transformed['Installs'].astype(str).str.replace('+', '', regex=False).str.replace(',', '', regex=False)
-    df_apps_transformed['Installs'] = pd.to_numeric(df_apps_transformed['Installs'], errors='coerce').astype(float)
+    record_count('dropped.installs_free', rows_before - len(df_apps_transformed))
+
+    # As contagens coerced.* registram quantos valores presentes na entrada o errors='coerce' transformou em NaN (ver pipeline.metrics).
+    # No modo vetorizado, a limpeza roda sobre os valores distintos (ver _map_unique).
+    raw_installs = df_apps_transformed['Installs']
+    if mode == 'reference':
+        df_apps_transformed['Installs'] = df_apps_transformed['Installs'].astype(str).str.replace('+', '', regex=False).str.replace(',', '', regex=False)
+        df_apps_transformed['Installs'] = pd.to_numeric(df_apps_transformed['Installs'], errors='coerce').astype(float)
+    else:
+        df_apps_transformed['Installs'] = _map_unique(raw_installs, lambda installs: pd.to_numeric(
+            installs.astype(str).str.replace('+', '', regex=False).str.replace(',', '', regex=False), errors='coerce').astype(float))
+    record_count('coerced.Installs', count_coerced(raw_installs, df_apps_transformed['Installs']))
     df_apps_transformed['Installs'].fillna(0, inplace=True)
 
-    df_apps_transformed['Price'] = df_apps_transformed['Price'].astype(str).str.replace('$', '', regex=False)
-    df_apps_transformed['Price'] = pd.to_numeric(df_apps_transformed['Price'], errors='coerce')
+    raw_price = df_apps_transformed['Price']
+    if mode == 'reference':
+        df_apps_transformed['Price'] = df_apps_transformed['Price'].astype(str).str.replace('$', '', regex=False)
+        df_apps_transformed['Price'] = pd.to_numeric(df_apps_transformed['Price'], errors='coerce')
+    else:
+        df_apps_transformed['Price'] = _map_unique(raw_price, lambda prices: pd.to_numeric(prices.astype(str).str.replace('$', '', regex=False), errors='coerce'))
+    record_count('coerced.Price', count_coerced(raw_price, df_apps_transformed['Price']))
     df_apps_transformed['Price'].fillna(0, inplace=True)
 
 
-    # Conceito: Encapsulamento de lógica complexa
-         #  Em vez de poluir o código principal com uma lógica de conversão, você criou uma pequena função aninhada, facilitando o entendimento. 
-         #  Objetivo: Converter os valores da coluna Size para uma unidade numérica consistente (megabytes - MB) e tratar valores não numéricos.
-         #  Convert_size é uma ferramenta de limpeza e padronização que garante que a sua coluna de tamanho dos aplicativos seja numérica e consistente
-    def convert_size(size):
-        if isinstance(size, str): # Verifica o Tipo de Dado: verifica se o valor na coluna Size é uma string (texto), necessária porque o script irá processar linha por linha, e alguns valores podem já estar em um formato numérico ou serem nulos
-            size = size.replace(',', '') # Remove Vírgulas: remove as vírgulas do texto, o que é um passo de limpeza fundamental para converter strings numéricas formatadas (ex: "1,000") em números.
-            if 'M' in size: # Lida com Unidades de Medida: Se a string contém 'M', a função remove o 'M' e converte o restante para um número decimal (megabytes).
-                return float(size.replace('M', ''))
-            elif 'k' in size: 
-                return float(size.replace('k', '')) / 1024
-            elif 'Varies with device' in size: # # Trata Valores Inconsistentes:  elif 'Varies with device' in size:Alguns aplicativos têm um tamanho que varia de acordo com o dispositivo. A função identifica este padrão e o converte para np.nan (Not a Number). Isso é crucial para que o valor seja tratado como um dado ausente e não cause um erro no cálculo da mediana, que é o próximo passo
-                return np.nan
-        return float(size) # Se o valor não se encaixa em nenhuma das condições acima (ou se o valor já era um número), a função o converte para o tipo float.
-
-
      # Conceito: Aplicação de função
         # .apply(convert_size): O método .apply() executa a função convert_size em cada valor da coluna Size do DataFrame. Ele passa cada valor para a função, que retorna o valor limpo e padronizado.
-    df_apps_transformed['Size'] = df_apps_transformed['Size'].apply(convert_size)
+    raw_size = df_apps_transformed['Size']
+    if mode == 'reference':
+        df_apps_transformed['Size'] = df_apps_transformed['Size'].apply(convert_size)
+    else:
+        df_apps_transformed['Size'] = convert_size_vectorized(df_apps_transformed['Size'])
+    # Inclui os "Varies with device", que viram NaN por decisão e são preenchidos com a mediana logo abaixo.
+    record_count('coerced.Size', count_coerced(raw_size, df_apps_transformed['Size']))
     # Conceito: Tratamento de valores ausentes.
         # Após a conversão, a coluna pode ter valores np.nan (do passo 4). Esta linha preenche esses valores ausentes com a mediana de todos os tamanhos de aplicativos, uma abordagem robusta para evitar distorções na análise.
-    df_apps_transformed['Size'].fillna(df_apps_transformed['Size'].median(), inplace=True)
+    if size_median is None:
+        size_median = df_apps_transformed['Size'].median()
+    df_apps_transformed['Size'].fillna(size_median, inplace=True)
 
         # O errors='coerce' é um parâmetro muito útil na função que lida com erros de conversão de forma flexível
         # Quando você tenta converter uma coluna para um tipo de dado específico (como data ou número), pode haver valores que não se encaixam nesse formato.
@@ -66,7 +142,12 @@ def transform_google_play_apps(df_apps: pd.DataFrame) -> pd.DataFrame:
         # Ao usar errors='coerce', você garante que o script não vai quebrar se encontrar uma data inválid
         # Os valores inválidos serão convertidos para NaT, permitindo que você os identifique e trate posteriormente (por exemplo, preenchendo-os com a mediana ou a moda, ou removendo as linhas, dependendo da sua estratégia).
         # torna o seu processo de transformação mais robusto e tolerante a falhas
-    df_apps_transformed['Last Updated'] = pd.to_datetime(df_apps_transformed['Last Updated'], errors='coerce')
+    raw_last_updated = df_apps_transformed['Last Updated']
+    if mode == 'reference':
+        df_apps_transformed['Last Updated'] = pd.to_datetime(df_apps_transformed['Last Updated'], errors='coerce')
+    else:
+        df_apps_transformed['Last Updated'] = _map_unique(raw_last_updated, lambda dates: pd.to_datetime(dates, errors='coerce'))
+    record_count('coerced.Last Updated', count_coerced(raw_last_updated, df_apps_transformed['Last Updated']))
 
 
     # Conceito: limpar e padronizar dados textuais de forma eficiente
@@ -85,7 +166,11 @@ def transform_google_play_apps(df_apps: pd.DataFrame) -> pd.DataFrame:
         # Conceito: O método .split() é comum para quebrar strings em listas de substrings. [0] acessa o primeiro item da lista resultante, que é o gênero principal.
 
 
-    df_apps_transformed['Genres'] = df_apps_transformed['Genres'].apply(lambda x: x.split(';')[0] if isinstance(x, str) else x)
+    # No modo vetorizado, .str.split(';', n=1).str[0] faz o mesmo corte sobre os gêneros distintos (valores nulos continuam nulos).
+    if mode == 'reference':
+        df_apps_transformed['Genres'] = df_apps_transformed['Genres'].apply(lambda x: x.split(';')[0] if isinstance(x, str) else x)
+    else:
+        df_apps_transformed['Genres'] = _map_unique(df_apps_transformed['Genres'], lambda genres: genres.str.split(';', n=1).str[0])
 
 
     # Esta linha remove linhas do DataFrame onde a coluna Category contém valores inválidos ou desalinhados que não representam uma categoria de texto real. Um exemplo notório neste dataset é uma linha onde "1.9" aparece na coluna Category, indicando um erro de parsing
@@ -100,13 +185,70 @@ def transform_google_play_apps(df_apps: pd.DataFrame) -> pd.DataFrame:
             # not ...: Inverte o resultado de .isdigit(). Ou seja, a condição not x.replace('.', '', 1).isdigit() será True se o valor não for um número (após o tratamento do ponto).
 # Conceito: A combinação isinstance(x, str) and not x.replace('.', '', 1).isdigit() cria uma condição que é True apenas para strings que são categorias válidas (não são números e são strings). Isso efetivamente filtra e remove as linhas com categorias malformadas.
 
-    df_apps_transformed = df_apps_transformed[df_apps_transformed['Category'].apply(lambda x: isinstance(x, str) and not x.replace('.', '', 1).isdigit())]
+# No modo vetorizado, a mesma condição é montada com .notna() e os métodos .str.replace(n=1) e .str.isdigit() sobre as categorias distintas.
+
+    if mode == 'reference':
+        valid_category = df_apps_transformed['Category'].apply(lambda x: isinstance(x, str) and not x.replace('.', '', 1).isdigit())
+    else:
+        valid_category = _map_unique(df_apps_transformed['Category'], lambda category: category.notna() & ~category.astype(str).str.replace('.', '', n=1, regex=False).str.isdigit())
+    df_apps_transformed = df_apps_transformed[valid_category]
+    record_count('dropped.invalid_category', (~valid_category).sum())
     
     logging.info("Transformação do DataFrame Apps concluída.")
 
     return df_apps_transformed
 
 
+# Conceito: Mediana exata em streaming.
+    # A mediana não é "somável" entre chunks, mas pode ser obtida de um histograma de valores: value_counts de cada chunk é somado, e a mediana sai das frequências acumuladas.
+    # Rating e Size têm poucos valores distintos, então a memória depende da cardinalidade das colunas, e não do número de linhas.
+def _median_from_counts(counts: pd.Series) -> float:
+    if counts is None or counts.empty:
+        return np.nan
+
+    counts = counts.sort_index()
+    cumulative = counts.cumsum().to_numpy()
+    total = cumulative[-1]
+    values = counts.index.to_numpy(dtype=float)
+
+    # Posições (base 0) dos elementos centrais; para total ímpar ambas apontam para o mesmo elemento.
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+    return (lower + upper) / 2
+
+
+def _add_counts(total: pd.Series | None, counts: pd.Series) -> pd.Series:
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0)
+
+
+# Primeira passada do modo streaming: reproduz, chunk a chunk, exatamente os filtros que antecedem cada fillna em transform_google_play_apps.
+    # Rating: mediana sobre todas as linhas brutas.
+    # Size: mediana após o dropna, o filtro de Installs == 'Free' e o convert_size.
+def compute_apps_medians(apps_chunks, mode: str = 'vectorized') -> tuple[float, float]:
+    _check_mode(mode)
+    logging.info("Calculando medianas globais de Rating e Size...")
+
+    rating_counts = None
+    size_counts = None
+
+    for chunk in apps_chunks:
+        ratings = pd.to_numeric(chunk['Rating'], errors='coerce')
+        rating_counts = _add_counts(rating_counts, ratings.value_counts())
+
+        valid = chunk.dropna(subset=['Type', 'Content Rating', 'Current Ver', 'Android Ver'])
+        valid = valid[valid['Installs'] != 'Free']
+        sizes = valid['Size'].apply(convert_size) if mode == 'reference' else convert_size_vectorized(valid['Size'])
+        size_counts = _add_counts(size_counts, sizes.value_counts())
+
+    rating_median = _median_from_counts(rating_counts)
+    size_median = _median_from_counts(size_counts)
+
+    logging.info(f"Medianas globais calculadas: Rating={rating_median}, Size={size_median}")
+    return rating_median, size_median
+
+
 # Esta função se concentra na tabela de reviews.
 def transform_user_reviews(df_reviews: pd.DataFrame) -> pd.DataFrame:
     logging.info("Iniciando a transformação do DataFrame de Reviews...")
@@ -115,10 +257,20 @@ def transform_user_reviews(df_reviews: pd.DataFrame) -> pd.DataFrame:
     df_reviews_transformed = df_reviews.copy()
 
     # A decisão de usar dropna em vez de fillna é estratégica: não há como inferir o sentimento de um review ausente, então o melhor a fazer é remover a linha.
+    rows_before = len(df_reviews_transformed)
     df_reviews_transformed.dropna(subset=['Translated_Review', 'Sentiment', 'Sentiment_Polarity', 'Sentiment_Subjectivity'], inplace=True)
+    record_count('dropped.missing_values', rows_before - len(df_reviews_transformed))
+
+    raw_polarity = df_reviews_transformed['Sentiment_Polarity']
+    raw_subjectivity = df_reviews_transformed['Sentiment_Subjectivity']
     df_reviews_transformed['Sentiment_Polarity'] = pd.to_numeric(df_reviews_transformed['Sentiment_Polarity'], errors='coerce')
     df_reviews_transformed['Sentiment_Subjectivity'] = pd.to_numeric(df_reviews_transformed['Sentiment_Subjectivity'], errors='coerce')
+    record_count('coerced.Sentiment_Polarity', count_coerced(raw_polarity, df_reviews_transformed['Sentiment_Polarity']))
+    record_count('coerced.Sentiment_Subjectivity', count_coerced(raw_subjectivity, df_reviews_transformed['Sentiment_Subjectivity']))
+
+    rows_before = len(df_reviews_transformed)
     df_reviews_transformed.dropna(subset=['Sentiment_Polarity', 'Sentiment_Subjectivity'], inplace=True)
+    record_count('dropped.invalid_sentiment', rows_before - len(df_reviews_transformed))
     
     logging.info("Transformação do DataFrame de Reviews concluída.")
 
@@ -127,9 +279,17 @@ def transform_user_reviews(df_reviews: pd.DataFrame) -> pd.DataFrame:
 
  # Conceito: Engenharia de Features
     # Esta é a função mais sofisticada do seu módulo.
-def aggregate_reviews(df_reviews_transformed: pd.DataFrame) -> pd.DataFrame:
+    # Com workers > 1, a agregação é particionada entre processos (ver aggregate_reviews_partitioned).
+def aggregate_reviews(df_reviews_transformed: pd.DataFrame, mode: str = 'vectorized', workers: int | None = None) -> pd.DataFrame:
+    _check_mode(mode)
     logging.info("Agregando reviews por app...")
 
+    if workers and workers > 1 and mode == 'vectorized':
+        return aggregate_reviews_partitioned(df_reviews_transformed, workers=workers)
+
+    if mode == 'vectorized':
+        return _aggregate_reviews_vectorized(df_reviews_transformed)
+
     # Criam novas colunas que são o resultado de uma transformação de dados. Isso prepara o DataFrame para a próxima etapa, que é a agregação.
     df_reviews_transformed['Positive_Count'] = df_reviews_transformed['Sentiment'].apply(lambda x: 1 if x == 'Positive' else 0)
     df_reviews_transformed['Negative_Count'] = df_reviews_transformed['Sentiment'].apply(lambda x: 1 if x == 'Negative' else 0)
@@ -151,6 +311,109 @@ def aggregate_reviews(df_reviews_transformed: pd.DataFrame) -> pd.DataFrame:
     return aggregated_reviews
 
 
+# Versão vetorizada: em vez de três colunas auxiliares criadas linha a linha com .apply, as máscaras booleanas de cada sentimento
+    # são somadas no mesmo groupby das médias e da contagem (como em partial_aggregate_reviews). O DataFrame de entrada não é modificado.
+def _aggregate_reviews_vectorized(df_reviews_transformed: pd.DataFrame) -> pd.DataFrame:
+    sentiment = df_reviews_transformed['Sentiment']
+
+    aggregated_reviews = df_reviews_transformed.assign(
+        Positive_Reviews=(sentiment == 'Positive').astype('int64'),
+        Negative_Reviews=(sentiment == 'Negative').astype('int64'),
+        Neutral_Reviews=(sentiment == 'Neutral').astype('int64'),
+    ).groupby('App').agg(
+        Avg_Sentiment_Polarity=('Sentiment_Polarity', 'mean'),
+        Avg_Sentiment_Subjectivity=('Sentiment_Subjectivity', 'mean'),
+        Total_Reviews=('Translated_Review', 'count'),
+        Positive_Reviews=('Positive_Reviews', 'sum'),
+        Negative_Reviews=('Negative_Reviews', 'sum'),
+        Neutral_Reviews=('Neutral_Reviews', 'sum'),
+    ).reset_index()
+
+    logging.info("Reviews agregadas com sucesso.")
+    return aggregated_reviews
+
+
+# Conceito: Agregados parciais (mergeable).
+    # Médias não podem ser combinadas entre chunks, mas somas e contagens sim. Cada chunk gera uma linha por app com somas e contagens;
+    # os parciais de vários chunks são somados com merge_review_partials e só no final viram médias em finalize_review_partials.
+    # Assim o modo streaming produz o mesmo resultado de aggregate_reviews sem manter todas as reviews em memória.
+def partial_aggregate_reviews(df_reviews_transformed: pd.DataFrame) -> pd.DataFrame:
+    sentiment = df_reviews_transformed['Sentiment']
+
+    partials = df_reviews_transformed.assign(
+        Positive_Reviews=(sentiment == 'Positive').astype('int64'),
+        Negative_Reviews=(sentiment == 'Negative').astype('int64'),
+        Neutral_Reviews=(sentiment == 'Neutral').astype('int64'),
+    ).groupby('App').agg(
+        Sum_Sentiment_Polarity=('Sentiment_Polarity', 'sum'),
+        Count_Sentiment_Polarity=('Sentiment_Polarity', 'count'),
+        Sum_Sentiment_Subjectivity=('Sentiment_Subjectivity', 'sum'),
+        Count_Sentiment_Subjectivity=('Sentiment_Subjectivity', 'count'),
+        Total_Reviews=('Translated_Review', 'count'),
+        Positive_Reviews=('Positive_Reviews', 'sum'),
+        Negative_Reviews=('Negative_Reviews', 'sum'),
+        Neutral_Reviews=('Neutral_Reviews', 'sum'),
+    )
+
+    return partials
+
+
+def merge_review_partials(partials: list[pd.DataFrame]) -> pd.DataFrame:
+    partials = [partial for partial in partials if partial is not None]
+    if len(partials) == 1:
+        return partials[0]
+    return pd.concat(partials).groupby(level='App').sum()
+
+
+def finalize_review_partials(partials: pd.DataFrame) -> pd.DataFrame:
+    aggregated_reviews = pd.DataFrame({
+        'Avg_Sentiment_Polarity': partials['Sum_Sentiment_Polarity'] / partials['Count_Sentiment_Polarity'],
+        'Avg_Sentiment_Subjectivity': partials['Sum_Sentiment_Subjectivity'] / partials['Count_Sentiment_Subjectivity'],
+        'Total_Reviews': partials['Total_Reviews'],
+        'Positive_Reviews': partials['Positive_Reviews'],
+        'Negative_Reviews': partials['Negative_Reviews'],
+        'Neutral_Reviews': partials['Neutral_Reviews'],
+    }).sort_index().reset_index()
+
+    logging.info("Reviews agregadas com sucesso.")
+    return aggregated_reviews
+
+
+# Conceito: Agregação particionada (multi-core).
+    # As reviews são divididas em partições e cada partição é reduzida a parciais (partial_aggregate_reviews) em um processo separado.
+    # partition_by='hash': cada app cai sempre na mesma partição (hash do nome), então cada grupo é somado inteiro em um único processo
+    #   e as médias finais saem idênticas às do groupby em um núcleo só.
+    # partition_by='chunk': fatias contíguas de linhas; um app pode aparecer em várias partições e os parciais são somados no merge.
+    # Como os parciais são somas e contagens, o mesmo merge serve para as partições, para o modo streaming e para combinações dos dois.
+def partition_reviews(df_reviews_transformed: pd.DataFrame, partitions: int, partition_by: str = 'hash') -> list[pd.DataFrame]:
+    if partition_by == 'chunk':
+        bounds = np.linspace(0, len(df_reviews_transformed), partitions + 1, dtype=int)
+        return [df_reviews_transformed.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+    if partition_by != 'hash':
+        raise ValueError(f"Particionamento desconhecido: {partition_by}. Opções: ('hash', 'chunk')")
+
+    buckets = pd.util.hash_pandas_object(df_reviews_transformed['App'], index=False).to_numpy() % partitions
+    return [partition for _, partition in df_reviews_transformed.groupby(buckets, sort=True)]
+
+
+def aggregate_reviews_partitioned(df_reviews_transformed: pd.DataFrame, workers: int = 4, partitions: int | None = None, partition_by: str = 'hash') -> pd.DataFrame:
+    partitions = partitions or workers
+    logging.info(f"Agregando reviews em {partitions} partições ({partition_by}) com {workers} processos...")
+
+    chunks = partition_reviews(df_reviews_transformed, partitions, partition_by)
+    if not chunks:
+        return _aggregate_reviews_vectorized(df_reviews_transformed)
+
+    # A etapa roda em uma thread do DAG; com fork, o filho herdaria locks presos por outras threads (logging, pandas) e poderia travar.
+        # forkserver (ou spawn, onde não existe, como no Windows) cria os processos a partir de um processo limpo.
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as pool:
+        partials = list(pool.map(partial_aggregate_reviews, chunks))
+
+    return finalize_review_partials(merge_review_partials(partials))
+
+
  # Conceito: Junção (Merge)
     # Esta função combina as duas tabelas. O how='left' significa que ele manterá todos os aplicativos da tabela da esquerda (df_apps)
     # E e adicionará as informações de reviews agregadas da tabela da direita (df_reviews), Se um app não tiver reviews, as colunas de reviews ficarão com valores nulos
@@ -161,8 +424,11 @@ def unify_dataframes(df_apps: pd.DataFrame, df_reviews: pd.DataFrame) -> pd.Data
         logging.error("Erro: A coluna 'App' não está presente em um ou ambos os DataFrames. Não é possível unificar.")
         return None
     
-    df_apps['App'] = df_apps['App'].astype(str)
-    df_reviews['App'] = df_reviews['App'].astype(str)
+    # assign cria novos DataFrames em vez de alterar os recebidos, que podem estar sendo lidos ao mesmo tempo por outra etapa (ex: a carga da tabela silver).
+    # Quando os dois lados já usam o mesmo dicionário de Apps (ver transform.dtypes), o merge compara os códigos inteiros e a conversão para texto é dispensada.
+    if not (isinstance(df_apps['App'].dtype, pd.CategoricalDtype) and df_apps['App'].dtype == df_reviews['App'].dtype):
+        df_apps = df_apps.assign(App=df_apps['App'].astype(str))
+        df_reviews = df_reviews.assign(App=df_reviews['App'].astype(str))
     df_unified = pd.merge(df_apps, df_reviews, on='App', how='left')
 
     logging.info("DataFrames unificados com sucesso.")